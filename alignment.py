@@ -0,0 +1,131 @@
+"""As-of alignment of datasets onto the x values of another dataset
+
+Datasets sampled at different times (trading days, calendar days, months)
+are compared on the timeline of a reference dataset: each reference x
+value takes the last row of the other dataset at or before it, like
+pandas.merge_asof(direction="backward"). Both x columns are sorted (once,
+when they are not already) and merged by binary search, and since the
+match only changes where a new row of the other dataset starts, only
+those change points are kept:
+
+    targetRows, sourceRows = asof_changes(reference_x, other_x)
+
+From targetRows[k] up to (not including) targetRows[k + 1], every
+reference row is matched to sourceRows[k], or to nothing when it is -1.
+The aligned series is the step line through (reference x at targetRows,
+other values at sourceRows), at most as long as the shorter of the two
+datasets, so nothing is reindexed onto the reference rows, let alone
+onto the union of the timelines. matched_rows spreads the change points
+over every reference row for computations that need them row by row.
+"""
+import numpy as np
+import pandas as pd
+
+
+def x_numbers(x):
+    """Datetime x values as int64 nanoseconds, numeric ones as float64, and the mask of missing values"""
+    x = pd.Series(x)
+    if pd.api.types.is_datetime64_any_dtype(x):
+        values = x.to_numpy(dtype="datetime64[ns]")
+        return values.view(np.int64), np.isnat(values)
+    values = x.to_numpy(dtype=float, na_value=np.nan)
+    return values, np.isnan(values)
+
+
+def _sorted(x):
+    """Numbers of x in ascending order and the rows they come from (None: x is sorted with no missing value)"""
+    values, missing = x_numbers(x)
+    if not missing.any() and not np.any(values[1:] < values[:-1]):
+        return values, None
+    rows = np.flatnonzero(~missing)
+    order = rows[np.argsort(values[rows], kind="stable")]
+    return values[order], order
+
+
+def asof_changes(target, source, tolerance=None):
+    """Target rows where the as-of match into source changes, and the source row matched from each (-1: none)
+
+    The match of a target x value is the last source row at or before it,
+    and at most tolerance before it (in nanoseconds for datetime x values).
+    By default tolerance is the largest gap between consecutive source
+    values: every target inside the span of source is matched, and targets
+    after its end only up to one such gap. Neither column has to be
+    sorted; target rows are returned in x order, and missing x values
+    never match. Returns two int64 arrays of equal length.
+    """
+    t, tOrder = _sorted(target)
+    s, sOrder = _sorted(source)
+    if not len(t) or not len(s):
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    if tolerance is None:
+        tolerance = np.diff(s).max() if len(s) > 1 else 0
+
+    # First target at or after each source value; a target reached by
+    # several source rows keeps the last of them
+    starts = np.searchsorted(t, s, side="left")
+    last = np.r_[starts[1:] != starts[:-1], True] & (starts < len(t))
+    starts, matched = starts[last], np.flatnonzero(last)
+
+    # Each match holds until the next one starts, or ends early (-1) at
+    # the first target more than tolerance after its source value
+    nextStarts = np.r_[starts[1:], len(t)]
+    ends = np.minimum(np.searchsorted(t, s[matched] + tolerance, side="right"), nextStarts)
+    points = np.stack((starts, ends), axis=1).reshape(-1)
+    rows = np.stack((matched, np.full(len(matched), -1)), axis=1).reshape(-1)
+    kept = np.stack((ends > starts, ends < nextStarts), axis=1).reshape(-1)
+    points, rows = points[kept], rows[kept]
+    # An unmatched run right after another one (or first) changes nothing
+    changed = (rows >= 0) | (np.r_[-1, rows[:-1]] >= 0)
+    starts, matched = points[changed], rows[changed]
+
+    targetRows = starts if tOrder is None else tOrder[starts]
+    sourceRows = matched if sOrder is None else np.where(matched >= 0, sOrder[np.maximum(matched, 0)], -1)
+    return targetRows.astype(np.int64), sourceRows.astype(np.int64)
+
+
+def sort_order(x):
+    """Rows of an x column in x order without the missing values, or None when it is sorted and complete"""
+    return _sorted(x)[1]
+
+
+def matched_rows(changes, rows, order=None):
+    """Source row matched to each of the rows target rows (-1: none), from the change points of asof_changes
+
+    With the target's sort_order, the rows are those of order, in x order.
+    """
+    targetRows, sourceRows = changes
+    if order is not None:
+        positions = np.empty(rows, dtype=np.int64)
+        positions[order] = np.arange(len(order))
+        targetRows, rows = positions[targetRows], len(order)
+    counts = np.diff(np.r_[targetRows, rows])
+    return np.r_[np.full(targetRows[0] if len(targetRows) else rows, -1), np.repeat(sourceRows, counts)]
+
+
+def take_rows(values, rows):
+    """values[rows] as float64, missing where rows is -1"""
+    values = np.asarray(values, dtype=np.float64)
+    if not len(values):
+        return np.full(len(rows), np.nan)
+    return np.where(rows >= 0, values[np.maximum(rows, 0)], np.nan)
+
+
+def rebase(lines, base=100.0):
+    """y values of (x, y) lines scaled to equal base at the latest x where one of them starts
+
+    Each line is divided by its last value at or before that x, so they
+    all start from base where every one of them has a value. Lines are
+    returned unchanged when one of them has no value at all.
+    """
+    finite = [np.isfinite(x) & np.isfinite(y) for x, y in lines]
+    if not all(mask.any() for mask in finite):
+        return [y for _, y in lines]
+    start = max(x[mask].min() for (x, _), mask in zip(lines, finite))
+
+    rebased = []
+    for (x, y), mask in zip(lines, finite):
+        rows = np.flatnonzero(mask & (x <= start))
+        first = y[rows[np.argmax(x[rows])]]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            rebased.append(y / first * base if first != 0 else np.full(len(y), np.nan))
+    return rebased
@@ -0,0 +1,168 @@
+"""FFT autocorrelation (ACF), cross-correlation and Durbin-Levinson partial autocorrelation (PACF)
+
+The functions take a 1-D series or a 2-D (rows, columns) array and work on
+all columns at once, so the checked columns of a dataset are a single call.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# Size of the pair spectra inverted together by cross_correlation, per batch
+BATCH_BYTES = 64 * 1024 * 1024
+
+
+def _fft_length(n):
+    """Smallest power of two >= n"""
+    return 1 << max(int(n) - 1, 0).bit_length()
+
+
+def max_lag(rows, nlags):
+    """Clamp a requested lag count to what a series of `rows` values supports"""
+    return max(min(int(nlags), rows - 1), 0)
+
+
+def acf(values, nlags):
+    """Sample autocorrelation at lags 0..nlags, via one real FFT per column
+
+    NaNs are treated as missing: the mean is taken over the finite values
+    and missing values contribute nothing to any lag. The estimator is the
+    usual biased one (every lag divided by the lag-0 sum), which keeps the
+    result a valid autocorrelation sequence for the PACF.
+
+    Returns an array of shape (nlags + 1,) for a 1-D input, otherwise
+    (nlags + 1, columns).
+    """
+    x = np.asarray(values, dtype=float)
+    squeeze = x.ndim == 1
+    if squeeze:
+        x = x[:, None]
+
+    rows = x.shape[0]
+    nlags = max_lag(rows, nlags)
+    finite = np.isfinite(x)
+    counts = finite.sum(axis=0)
+    means = np.where(finite, x, 0.0).sum(axis=0) / np.maximum(counts, 1)
+    centered = np.where(finite, x - means, 0.0)
+
+    # Zero padding to rows + nlags keeps the circular correlation from
+    # wrapping into the lags we keep
+    nfft = _fft_length(rows + nlags)
+    spectrum = np.fft.rfft(centered, n=nfft, axis=0)
+    acov = np.fft.irfft(spectrum.real ** 2 + spectrum.imag ** 2, n=nfft, axis=0)[:nlags + 1]
+
+    variance = acov[0]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        result = np.where(variance > 0, acov / variance, np.nan)
+    return result[:, 0] if squeeze else result
+
+
+def cross_correlation(values, nlags, workers=None):
+    """Sample cross-correlation of every pair of columns at lags -nlags..nlags, via batched real FFTs
+
+    r[i, j, nlags + k] correlates column i at row t + k with column j at
+    row t, so a peak at k > 0 means column j leads column i by k rows.
+    r[j, i] is r[i, j] reversed and r[i, i] is the ACF of column i; missing
+    values and the estimator are those of acf(). Every column is
+    transformed once, then the products of the spectra of all pairs are
+    inverted in batches, spread over `workers` threads (numpy's FFT runs
+    without the GIL), instead of one correlation per pair and lag.
+
+    Returns a (columns, columns, 2 * nlags + 1) array, NaN for columns
+    without variance.
+    """
+    x = np.asarray(values, dtype=float)
+    if x.ndim == 1:
+        x = x[:, None]
+
+    rows, columns = x.shape
+    nlags = max_lag(rows, nlags)
+    finite = np.isfinite(x)
+    means = np.where(finite, x, 0.0).sum(axis=0) / np.maximum(finite.sum(axis=0), 1)
+    centered = np.where(finite, x - means, 0.0)
+    norms = np.sqrt((centered * centered).sum(axis=0))
+    constant = norms == 0
+    centered /= np.where(constant, 1.0, norms)
+
+    nfft = _fft_length(rows + nlags)
+    spectra = np.ascontiguousarray(np.fft.rfft(centered, n=nfft, axis=0).T)
+    result = np.empty((columns, columns, 2 * nlags + 1))
+    first, second = np.triu_indices(columns)
+    batch = max(BATCH_BYTES // (16 * spectra.shape[1]), 1)
+
+    def invert(start):
+        i, j = first[start:start + batch], second[start:start + batch]
+        circular = np.fft.irfft(spectra[i] * spectra[j].conj(), n=nfft, axis=1)
+        # Negative lags wrapped around to the end
+        lagged = np.concatenate((circular[:, nfft - nlags:], circular[:, :nlags + 1]), axis=1)
+        result[i, j] = lagged
+        result[j, i] = lagged[:, ::-1]
+
+    starts = range(0, len(first), batch)
+    workers = min(workers or os.cpu_count() or 1, len(starts))
+    if workers > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(invert, starts))
+    else:
+        for start in starts:
+            invert(start)
+
+    result[constant] = np.nan
+    result[:, constant] = np.nan
+    return result
+
+
+def peak_correlation(r):
+    """Correlation of largest magnitude of each pair of a cross_correlation result, and its lag
+
+    Returns two (columns, columns) arrays; pairs that are all NaN have a
+    NaN peak at lag 0.
+    """
+    nlags = (r.shape[-1] - 1) // 2
+    best = np.where(np.isnan(r), -1.0, np.abs(r)).argmax(axis=-1)
+    peak = np.take_along_axis(r, best[..., None], axis=-1)[..., 0]
+    return peak, np.where(np.isnan(peak), 0, best - nlags)
+
+
+def durbin_levinson(r):
+    """Partial autocorrelation at lags 0..L from autocorrelations r[0..L]
+
+    r is (L + 1,) or (L + 1, columns); every column is advanced together.
+    Each step costs O(k), so the whole recursion is O(L^2) per column
+    instead of solving L Yule-Walker systems.
+    """
+    r = np.asarray(r, dtype=float)
+    squeeze = r.ndim == 1
+    if squeeze:
+        r = r[:, None]
+
+    nlags = r.shape[0] - 1
+    columns = r.shape[1]
+    pacf = np.empty((nlags + 1, columns))
+    pacf[0] = 1.0
+    if nlags == 0:
+        return pacf[:, 0] if squeeze else pacf
+
+    # phi[:k] holds the order-k autoregressive coefficients
+    phi = np.zeros((nlags, columns))
+    phi[0] = r[1]
+    pacf[1] = r[1]
+    error = 1.0 - r[1] ** 2
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for k in range(1, nlags):
+            reflection = (r[k + 1] - np.einsum("ij,ij->j", phi[:k], r[k:0:-1])) / error
+            phi[:k] = phi[:k] - reflection * phi[k - 1::-1]
+            phi[k] = reflection
+            pacf[k + 1] = reflection
+            error = error * (1.0 - reflection ** 2)
+    return pacf[:, 0] if squeeze else pacf
+
+
+def pacf(values, nlags):
+    """Sample partial autocorrelation at lags 0..nlags (Yule-Walker, via Durbin-Levinson)"""
+    return durbin_levinson(acf(values, nlags))
+
+
+def confidence_bound(count, z=1.96):
+    """Half-width of the approximate 95% band for white noise of `count` values"""
+    return z / np.sqrt(max(count, 1))
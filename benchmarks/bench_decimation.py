@@ -0,0 +1,65 @@
+"""Redraw time of a single series with and without min/max decimation
+
+Run from the repository root:
+
+    python benchmarks/bench_decimation.py [--max-rows 10000000] [--raw-limit 1000000]
+
+Each row count is drawn offscreen (Agg) at the default canvas size. With
+decimation the redraw time should stay roughly flat as rows grow, since
+matplotlib only ever receives about 2 * axes-width points.
+"""
+import argparse
+import os
+import sys
+import time
+
+import matplotlib
+matplotlib.use("Agg")
+from matplotlib.figure import Figure
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from decimation import decimate_indices
+
+
+def redraw_time(x, y, decimate, repeat=3):
+    """Best-of-`repeat` time to plot and rasterize one series"""
+    fig = Figure(figsize=(8, 6))
+    ax = fig.subplots()
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        ax.clear()
+        if decimate:
+            idx = decimate_indices(x, y, int(ax.bbox.width))
+            ax.plot(x[idx], y[idx], linewidth=1.8)
+        else:
+            ax.plot(x, y, linewidth=1.8)
+        fig.canvas.draw()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--max-rows", type=int, default=10_000_000)
+    parser.add_argument("--raw-limit", type=int, default=1_000_000,
+                        help="largest row count also drawn without decimation")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'rows':>10} {'decimated (s)':>14} {'raw (s)':>10}")
+
+    rows = 10_000
+    while rows <= args.max_rows:
+        x = np.arange(rows, dtype=float)
+        y = np.cumsum(rng.standard_normal(rows))
+        decimated = redraw_time(x, y, decimate=True)
+        raw = redraw_time(x, y, decimate=False) if rows <= args.raw_limit else None
+        raw_text = f"{raw:10.3f}" if raw is not None else f"{'-':>10}"
+        print(f"{rows:>10} {decimated:14.3f} {raw_text}")
+        rows *= 10
+
+
+if __name__ == "__main__":
+    main()
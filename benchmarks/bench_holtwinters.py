@@ -0,0 +1,111 @@
+"""Holt-Winters speed against the per-element loops of Tp3.ipynb
+
+Run from the repository root:
+
+    python benchmarks/bench_holtwinters.py [--column TEMPERATURE]
+
+The reference implementations below reproduce the notebook's loops
+(Python lists grown element by element, pandas indexed per element) on a
+single column of weather_data_kolkata_2015_2020.csv.
+"""
+import argparse
+import os
+import sys
+import time
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import holtwinters
+
+
+def notebook_ses(series, alpha):
+    result = [series[0]]
+    for i in range(1, len(series)):
+        result.append((1 - alpha) * series[i] + (alpha * result[i - 1]))
+    return result
+
+
+def notebook_des(series, alpha, beta):
+    level = [series[0]]
+    trend = [series[1] - series[0]]
+    result = [series[0]]
+    for t in range(1, len(series)):
+        level.append(alpha * series[t] + (1 - alpha) * (level[t - 1] + trend[t - 1]))
+        trend.append(beta * (level[t] - level[t - 1]) + (1 - beta) * trend[t - 1])
+        result.append(level[t] + trend[t])
+    return result
+
+
+def notebook_hw_additive(series, alpha, beta, gamma, periods):
+    level = [series[0]]
+    trend = [series[1] - series[0]]
+    result = [series[0]]
+    seasonality = [series[i] - series[0] for i in range(periods)]
+    for t in range(1, len(series)):
+        level.append(alpha * (series[t] - seasonality[t % periods]) + (1 - alpha) * (level[t - 1] + trend[t - 1]))
+        trend.append(beta * (level[t] - level[t - 1]) + (1 - beta) * trend[t - 1])
+        seasonality.append(gamma * (series[t] - level[t]) + (1 - gamma) * seasonality[t % periods])
+        result.append(level[t] + trend[t] + seasonality[t % periods])
+    return result
+
+
+def notebook_hw_multiplicative(series, alpha, beta, gamma, periods):
+    level = [series[0]]
+    trend = [series[1] - series[0]]
+    result = [series[0]]
+    seasonality = [series[i] / series[0] for i in range(periods)]
+    for t in range(1, len(series)):
+        level.append(alpha * (series[t] / seasonality[t % periods]) + (1 - alpha) * (level[t - 1] + trend[t - 1]))
+        trend.append(beta * (level[t] - level[t - 1]) + (1 - beta) * trend[t - 1])
+        seasonality.append(gamma * (series[t] / level[t]) + (1 - gamma) * seasonality[t % periods])
+        result.append((level[t] + trend[t]) * seasonality[t % periods])
+    return result
+
+
+def best_time(function, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--column", default="TEMPERATURE")
+    parser.add_argument("--period", type=int, default=24)
+    args = parser.parse_args()
+
+    df = pd.read_csv(os.path.join(ROOT, "dataset", "weather_data_kolkata_2015_2020.csv"))
+    series = df[args.column].interpolate().bfill()
+    values = series.to_numpy(dtype=float)
+    alpha, beta, gamma, period = 0.5, 0.1, 0.1, args.period
+
+    cases = [
+        ("SES", lambda: notebook_ses(series, alpha),
+         lambda: holtwinters.simple_exponential_smoothing(values, alpha)),
+        ("DES", lambda: notebook_des(series, alpha, beta),
+         lambda: holtwinters.double_exponential_smoothing(values, alpha, beta)),
+        ("HW additive", lambda: notebook_hw_additive(series, alpha, beta, gamma, period),
+         lambda: holtwinters.holt_winters_additive(values, alpha, beta, gamma, period)),
+        ("HW multiplicative", lambda: notebook_hw_multiplicative(series, alpha, beta, gamma, period),
+         lambda: holtwinters.holt_winters_multiplicative(values, alpha, beta, gamma, period)),
+    ]
+
+    # First call compiles the numba kernels
+    for _, _, fast in cases:
+        fast()
+
+    print(f"{len(values)} rows, numba {'enabled' if holtwinters.HAVE_NUMBA else 'not installed'}")
+    print(f"{'model':<18} {'notebook (s)':>13} {'engine (s)':>11} {'speed-up':>9}")
+    for name, notebook, fast in cases:
+        slow_time = best_time(notebook, 1)
+        fast_time = best_time(fast, 5)
+        print(f"{name:<18} {slow_time:13.3f} {fast_time:11.5f} {slow_time / fast_time:8.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""Cold-start time of the main window
+
+Run from the repository root:
+
+    python benchmarks/bench_startup.py [--runs 10] [--json startup.json]
+
+Each run starts `main.py --startup-benchmark` in a fresh interpreter and
+reads back two wall-clock stamps:
+
+    shown  the window is on screen and the event loop is running
+    ready  the plotting modules are imported and the canvases drawn
+
+Both are counted from just before the process is spawned, so they include
+interpreter start-up and every import. The median and best of --runs are
+checked against the targets below; the exit status is 1 when a median
+misses its target. Without a display, set QT_QPA_PLATFORM=offscreen.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Median seconds from launch
+TARGETS = {"shown": 0.3, "ready": 1.5}
+
+
+def run_once():
+    """{stage: seconds from launch} of one cold start"""
+    start = time.time()
+    result = subprocess.run([sys.executable, os.path.join(ROOT, "main.py"), "--startup-benchmark"],
+                            cwd=ROOT, capture_output=True, text=True, timeout=120)
+    stages = {}
+    for line in result.stdout.splitlines():
+        stage, _, stamp = line.partition(" ")
+        if stage in TARGETS:
+            stages[stage] = float(stamp) - start
+    if set(stages) != set(TARGETS):
+        raise RuntimeError(f"main.py exited with {result.returncode} before startup finished:\n"
+                           f"{result.stderr[-2000:]}")
+    return stages
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+
+    # Untimed first run: fills the OS file cache and matplotlib's font cache
+    run_once()
+    runs = [run_once() for _ in range(args.runs)]
+
+    print(f"{'stage':<8} {'median (s)':>10} {'best (s)':>10} {'target (s)':>10}")
+    results = {}
+    missed = False
+    for stage, target in TARGETS.items():
+        times = [run[stage] for run in runs]
+        median = statistics.median(times)
+        results[stage] = {"median": median, "best": min(times), "target": target, "runs": times}
+        missed |= median > target
+        print(f"{stage:<8} {median:10.3f} {min(times):10.3f} {target:10.3f}"
+              f"{'' if median <= target else '  MISSED'}")
+
+    if args.json:
+        report = {
+            "commit": git_commit(),
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "results": results,
+        }
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=1)
+        print(f"\nresults written to {args.json}")
+    return 1 if missed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
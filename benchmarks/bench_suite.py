@@ -0,0 +1,186 @@
+"""Load, transform and render timings of the bundled and synthetic datasets
+
+Run from the repository root:
+
+    python benchmarks/bench_suite.py [--max-rows 10000000] [--repeat 3]
+                                     [--json results.json] [--compare baseline.json]
+
+Every bundled dataset/*.csv, plus a synthetic minute-sampled random walk
+at 10^4 .. --max-rows rows, goes through the stages behind adding and
+plotting a dataset in the app:
+
+    parse      read_dataset (CSV parsing and datetime conversion)
+    cached     reopening the dataset from the on-disk cache
+    transform  every smoothing/trend overlay on the first numeric column
+    render     the Agg export of all numeric columns with SES and SMA overlays
+
+Times are the best of --repeat runs after a warm-up run; peak memory is traced (tracemalloc)
+in one extra run, so it does not slow the timed ones. Synthetic CSV files
+are generated once into --data-dir and reused by later runs, so runs at
+different commits read identical input. --json writes the results with
+the commit and library versions, and --compare prints the change from
+such a file.
+"""
+import argparse
+import glob
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import matplotlib
+matplotlib.use("Agg")
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from dataio import dataset_name, read_dataset
+from datasetcache import DatasetCache
+from figures import render_dataset
+from transforms import OVERLAY_TRANSFORMS, apply_overlay
+
+RENDER_OVERLAYS = (("SES", dict(linestyle="--", alpha=0.75, linewidth=1.5)),
+                   ("SMA", dict(linestyle=":", alpha=0.75, linewidth=1.8)))
+
+
+def measure(function, repeat):
+    """(best time in seconds over repeat runs, peak traced bytes of one more run)"""
+    # Untimed first run: numba compilation, imports and first-use caches
+    function()
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        function()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return best, peak
+
+
+def synthetic_csv(rows, directory):
+    """Path of a minute-sampled random walk with `rows` rows, generated on first use"""
+    path = os.path.join(directory, f"synthetic_{rows}.csv")
+    if not os.path.exists(path):
+        os.makedirs(directory, exist_ok=True)
+        rng = np.random.default_rng(0)
+        df = pd.DataFrame({
+            "Timestamp": pd.date_range("2000-01-01", periods=rows, freq="min"),
+            "value": np.cumsum(rng.standard_normal(rows)),
+            "noise": rng.standard_normal(rows),
+        })
+        df.to_csv(path + ".tmp", index=False, float_format="%.6f")
+        os.replace(path + ".tmp", path)
+    return path
+
+
+def bench_file(path, repeat, cache):
+    """Results of every stage for one CSV file"""
+    name = dataset_name(path)
+    results = []
+
+    def record(stage, case, function):
+        seconds, peak = measure(function, repeat)
+        results.append({"stage": stage, "case": case, "dataset": name, "rows": rows,
+                        "seconds": seconds, "peak_bytes": peak})
+        print(f"{stage:<10} {case:<6} {name[:36]:<36} {rows:>10} {seconds:10.4f} {peak / 2**20:10.1f}")
+
+    df = read_dataset(path)
+    rows = len(df)
+    record("parse", "csv", lambda: read_dataset(path))
+
+    digest, cached = cache.lookup(path)
+    if not cached:
+        cache.store(path, df, digest)
+    record("cached", "mmap", lambda: cache.load(digest))
+
+    x = df[df.columns[0]]
+    columns = [column for column in df.columns[1:] if pd.api.types.is_numeric_dtype(df[column])]
+    if not columns:
+        return results
+    index = pd.DatetimeIndex(x) if pd.api.types.is_datetime64_any_dtype(x) else None
+    series = pd.Series(df[columns[0]].to_numpy(dtype=float), index=index)
+    for overlay in OVERLAY_TRANSFORMS:
+        record("transform", overlay, lambda: apply_overlay(series, overlay))
+
+    colors = {column: f"C{idx}" for idx, column in enumerate(df.columns)}
+    record("render", "agg", lambda: render_dataset(io.BytesIO(), name, df, columns, colors,
+                                                  RENDER_OVERLAYS, dpi=100))
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline):
+    """Print the change of every result also present in a baseline file"""
+    with open(baseline, encoding="utf-8") as f:
+        previous = {(r["stage"], r["case"], r["dataset"], r["rows"]): r for r in json.load(f)["results"]}
+    print(f"\nchange from {baseline}:")
+    for result in results:
+        old = previous.get((result["stage"], result["case"], result["dataset"], result["rows"]))
+        if old is None or old["seconds"] == 0:
+            continue
+        change = result["seconds"] / old["seconds"] - 1
+        print(f"{result['stage']:<10} {result['case']:<6} {result['dataset'][:36]:<36} "
+              f"{result['rows']:>10} {change:+9.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--max-rows", type=int, default=10_000_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--no-bundled", action="store_true", help="skip the dataset/*.csv files")
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "statviz-bench"),
+                        help="where synthetic CSV files are generated and kept")
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--compare", help="results file of an earlier run to compare against")
+    args = parser.parse_args()
+
+    files = [] if args.no_bundled else sorted(glob.glob(os.path.join(ROOT, "dataset", "*.csv")))
+    rows = 10_000
+    while rows <= args.max_rows:
+        files.append(synthetic_csv(rows, args.data_dir))
+        rows *= 10
+
+    print(f"{'stage':<10} {'case':<6} {'dataset':<36} {'rows':>10} {'best (s)':>10} {'peak (MB)':>10}")
+    results = []
+    with tempfile.TemporaryDirectory() as cacheDir:
+        cache = DatasetCache(cacheDir)
+        for path in files:
+            results += bench_file(path, args.repeat, cache)
+
+    if args.json:
+        report = {
+            "commit": git_commit(),
+            "date": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "versions": {"numpy": np.__version__, "pandas": pd.__version__,
+                         "matplotlib": matplotlib.__version__},
+            "repeat": args.repeat,
+            "results": results,
+        }
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=1)
+        print(f"\nresults written to {args.json}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""Smoothing parameter search over every bundled dataset
+
+Run from the repository root:
+
+    python benchmarks/bench_tuning.py [--points 20] [--rounds 1] [--workers N]
+
+With the default --rounds 1 each model/column is scored on a dense
+points^3 grid (points^1 for SES, points^2 for Holt); more rounds refine
+the grid around the best candidate. Series are spread over a process pool.
+"""
+import argparse
+import glob
+import os
+import sys
+import time
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from dataio import dataset_name, read_dataset
+from holtwinters import infer_period
+from tuning import MODELS, search_many
+
+
+def collect_jobs():
+    jobs = []
+    for path in sorted(glob.glob(os.path.join(ROOT, "dataset", "*.csv"))):
+        df = read_dataset(path)
+        x = df[df.columns[0]]
+        period = infer_period(pd.DatetimeIndex(x)) if pd.api.types.is_datetime64_any_dtype(x) else None
+        for column in df.columns[1:]:
+            if not pd.api.types.is_numeric_dtype(df[column]):
+                continue
+            values = df[column].to_numpy(dtype=float)
+            for model in MODELS:
+                jobs.append((f"{dataset_name(path)}:{column}", values, model, period or 12))
+    return jobs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--points", type=int, default=20)
+    parser.add_argument("--rounds", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    jobs = collect_jobs()
+    start = time.perf_counter()
+    results = search_many(jobs, max_workers=args.workers, points=args.points, rounds=args.rounds)
+    elapsed = time.perf_counter() - start
+
+    failed = sum("error" in result for result in results.values())
+    print(f"{len(jobs)} searches ({len(jobs) - failed} fitted, {failed} not applicable) "
+          f"on a {args.points}-point grid x {args.rounds} round(s): {elapsed:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
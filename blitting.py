@@ -0,0 +1,48 @@
+"""Blitting of frequently changing artists over a cached canvas background"""
+from contextlib import contextmanager
+
+
+class BlitManager:
+    """Redraw animated artists over a background captured at the last full draw
+
+    Artists returned by `artists()` must be marked animated so that a full
+    draw leaves them out of the cached background. Any full draw (resize,
+    zoom, theme change) refreshes the background automatically.
+    """
+    def __init__(self, canvas, artists):
+        self.canvas = canvas
+        self.artists = artists
+        self.background = None
+        canvas.mpl_connect("draw_event", self.onDraw)
+
+    def onDraw(self, event):
+        """Capture the static background and draw the animated artists on top"""
+        self.background = self.canvas.copy_from_bbox(self.canvas.figure.bbox)
+        self.drawArtists()
+
+    def drawArtists(self):
+        figure = self.canvas.figure
+        for artist in self.artists():
+            figure.draw_artist(artist)
+
+    def update(self):
+        """Redraw only the animated artists"""
+        if self.background is None:
+            self.canvas.draw_idle()
+            return
+
+        self.canvas.restore_region(self.background)
+        self.drawArtists()
+        self.canvas.blit(self.canvas.figure.bbox)
+
+    @contextmanager
+    def staticArtists(self):
+        """Temporarily un-animate the artists, e.g. so savefig renders them"""
+        artists = list(self.artists())
+        for artist in artists:
+            artist.set_animated(False)
+        try:
+            yield
+        finally:
+            for artist in artists:
+                artist.set_animated(True)
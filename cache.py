@@ -0,0 +1,91 @@
+"""Memory-bounded LRU cache for derived series"""
+from collections import OrderedDict
+
+import numpy as np
+
+
+class SeriesCache:
+    """Least-recently-used cache of arrays, evicted by total size in bytes
+
+    Keys should identify everything the value depends on (dataset, column,
+    method, parameters, data version) so stale entries are never returned;
+    they simply age out.
+    """
+    def __init__(self, maxBytes=256 * 1024 * 1024):
+        self.maxBytes = maxBytes
+        self.currentBytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def get(self, key, compute, dtype=float):
+        """Return the cached value for key, calling compute() on a miss
+
+        The computed value is stored as an array of dtype; with dtype=None
+        it keeps its own (e.g. integer row indices).
+        """
+        value = self.lookup(key)
+        if value is None:
+            value = np.asarray(compute(), dtype=dtype)
+            self.put(key, value)
+        return value
+
+    def lookup(self, key):
+        """Return the cached value for key, or None on a miss
+
+        Counted like get(), for callers that compute the missing values of
+        several keys at once and then put() them.
+        """
+        if key in self._entries:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return self._entries[key]
+
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        """Store a value, evicting the least recently used entries if needed"""
+        if key in self._entries:
+            self.currentBytes -= self._entries.pop(key).nbytes
+
+        # A value larger than the whole budget is returned but never cached
+        if value.nbytes > self.maxBytes:
+            return
+
+        self._entries[key] = value
+        self.currentBytes += value.nbytes
+        while self.currentBytes > self.maxBytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.currentBytes -= evicted.nbytes
+            self.evictions += 1
+
+    def invalidate(self, predicate):
+        """Drop every entry whose key satisfies predicate(key)"""
+        for key in [key for key in self._entries if predicate(key)]:
+            self.currentBytes -= self._entries.pop(key).nbytes
+
+    def clear(self):
+        """Drop all entries; statistics are kept"""
+        self._entries.clear()
+        self.currentBytes = 0
+
+    def stats(self):
+        """Return hit/miss/eviction counters and current usage"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hitRate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "bytes": self.currentBytes,
+            "maxBytes": self.maxBytes,
+        }
@@ -0,0 +1,256 @@
+"""Single-pass column statistics of datasets read in chunks
+
+Memory is bounded by the chunk size, the largest lag and the quantile
+sketch capacity, never by the number of rows, so a CSV file larger than
+RAM can be summarized without loading it:
+
+    summary = summarize_csv("big.csv", lags=(1, 12))
+    summary["columns"]["value"]["std"], summary["columns"]["value"]["acf"][12]
+
+Means and variances are merged chunk by chunk with the batch form of
+Welford's update (Chan et al.), quantiles come from a compactor sketch and
+lag-k autocorrelations from cross sums carried over chunk boundaries. The
+autocorrelation is the biased estimator of autocorrelation.acf, so both
+agree on data that fits in memory.
+"""
+import numpy as np
+import pandas as pd
+
+from datastore import Dataset
+
+CHUNK_ROWS = 1 << 16
+DEFAULT_LAGS = (1,)
+DEFAULT_QUANTILES = (0.25, 0.5, 0.75)
+
+
+def quantile_label(q):
+    """Field name of a quantile: 0.25 -> "p25" """
+    return f"p{q * 100:g}"
+
+
+class QuantileSketch:
+    """Approximate quantiles of a stream in O(capacity * log(n / capacity)) memory
+
+    Values are kept in levels, a value at level i standing for 2**i inputs.
+    A level holding more than `capacity` values is sorted and every other
+    one (from a random start) moves up a level. Until `capacity` values
+    have been seen nothing is compacted and the quantiles are exact.
+    """
+    def __init__(self, capacity=4096, seed=0):
+        self.capacity = capacity
+        self.count = 0
+        self.levels = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values):
+        """Add values; NaNs are ignored"""
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if values.size == 0:
+            return
+        self.count += values.size
+        self.levels[0] = np.concatenate((self.levels[0], values))
+        level = 0
+        while level < len(self.levels) and self.levels[level].size > self.capacity:
+            items = np.sort(self.levels[level])
+            # An odd value out stays behind, so the kept weight is exact
+            kept, items = items[:items.size % 2], items[items.size % 2:]
+            if level + 1 == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[level] = kept
+            self.levels[level + 1] = np.concatenate((self.levels[level + 1],
+                                                     items[self._rng.integers(2)::2]))
+            level += 1
+
+    def quantiles(self, qs):
+        """Values at the quantiles qs, interpolated like np.quantile (NaN when empty)"""
+        qs = np.asarray(qs, dtype=float)
+        items = np.concatenate(self.levels)
+        if items.size == 0:
+            return np.full(qs.shape, np.nan)
+        weights = np.concatenate([np.full(level.size, 2.0 ** i) for i, level in enumerate(self.levels)])
+        order = np.argsort(items, kind="stable")
+        items, weights = items[order], weights[order]
+        # Rank of the first input each value stands for; with unit weights this is np.quantile
+        ranks = np.cumsum(weights) - weights
+        return np.interp(qs * (weights.sum() - 1), ranks, items)
+
+    @property
+    def nbytes(self):
+        return sum(level.nbytes for level in self.levels)
+
+
+class RunningStats:
+    """Statistics of columns fed as successive (rows, columns) chunks
+
+    Non-finite values count as missing: they are left out of every
+    statistic and contribute no pair to any lag, as in autocorrelation.acf.
+    Lag sums are taken about a per-column shift (the mean of the first
+    chunk holding values) to keep the cancellation in the final centering
+    small for series with a large mean.
+    """
+    def __init__(self, columns, lags=DEFAULT_LAGS, sketchCapacity=4096):
+        self.columns = list(columns)
+        self.lags = tuple(sorted({int(lag) for lag in lags if int(lag) > 0}))
+        width = len(self.columns)
+        self.rows = 0
+        self.count = np.zeros(width, dtype=np.int64)
+        self.mean = np.zeros(width)
+        self.m2 = np.zeros(width)
+        self.min = np.full(width, np.inf)
+        self.max = np.full(width, -np.inf)
+        self.sketches = [QuantileSketch(sketchCapacity) for _ in self.columns]
+
+        self.shift = np.full(width, np.nan)
+        shape = (len(self.lags), width)
+        self.lagProducts = np.zeros(shape)
+        self.lagLeft = np.zeros(shape)
+        self.lagRight = np.zeros(shape)
+        self.lagCount = np.zeros(shape, dtype=np.int64)
+        # Last rows of the previous chunks, shifted, for pairs spanning a boundary
+        self.tail = np.empty((0, width))
+
+    def update(self, values):
+        """Add a chunk: a (rows, columns) array, or 1-D for a single column"""
+        x = np.asarray(values, dtype=float).reshape(len(values), len(self.columns))
+        if x.shape[0] == 0:
+            return
+        finite = np.isfinite(x)
+        x = np.where(finite, x, np.nan)
+
+        # Merge the chunk's count, mean and sum of squared deviations
+        count = finite.sum(axis=0)
+        has = count > 0
+        mean = np.where(finite, x, 0.0).sum(axis=0) / np.maximum(count, 1)
+        m2 = np.where(finite, x - mean, 0.0)
+        m2 = (m2 * m2).sum(axis=0)
+        total = self.count + count
+        weight = count / np.maximum(total, 1)
+        delta = mean - self.mean
+        self.m2 += m2 + delta * delta * self.count * weight
+        self.mean += delta * weight
+        self.count = total
+
+        self.min = np.minimum(self.min, np.where(finite, x, np.inf).min(axis=0))
+        self.max = np.maximum(self.max, np.where(finite, x, -np.inf).max(axis=0))
+        for column, sketch in enumerate(self.sketches):
+            sketch.update(x[:, column])
+
+        if self.lags:
+            self._updateLags(x, mean, has)
+        self.rows += x.shape[0]
+
+    def _updateLags(self, x, chunkMean, has):
+        first = np.isnan(self.shift) & has
+        self.shift[first] = chunkMean[first]
+        y = np.concatenate((self.tail, x - self.shift))
+        start = len(self.tail)
+        for i, lag in enumerate(self.lags):
+            begin = max(start, lag)
+            if begin >= len(y):
+                continue
+            left, right = y[begin - lag:len(y) - lag], y[begin:]
+            pair = np.isfinite(left) & np.isfinite(right)
+            left, right = np.where(pair, left, 0.0), np.where(pair, right, 0.0)
+            self.lagProducts[i] += (left * right).sum(axis=0)
+            self.lagLeft[i] += left.sum(axis=0)
+            self.lagRight[i] += right.sum(axis=0)
+            self.lagCount[i] += pair.sum(axis=0)
+        self.tail = y[-self.lags[-1]:].copy()
+
+    def autocorrelations(self):
+        """(lags, columns) array of lag autocorrelations"""
+        centre = np.where(np.isnan(self.shift), 0.0, self.mean - self.shift)
+        acov = self.lagProducts - centre * (self.lagLeft + self.lagRight) + self.lagCount * centre * centre
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self.m2 > 0, acov / self.m2, np.nan)
+
+    def result(self, quantiles=DEFAULT_QUANTILES):
+        """{column: statistics} of everything fed so far (sample variance)"""
+        acfs = self.autocorrelations()
+        columns = {}
+        for i, column in enumerate(self.columns):
+            count = int(self.count[i])
+            variance = self.m2[i] / (count - 1) if count > 1 else np.nan
+            columns[column] = {
+                "count": count,
+                "missing": self.rows - count,
+                "mean": self.mean[i] if count else np.nan,
+                "variance": variance,
+                "std": np.sqrt(variance),
+                "min": self.min[i] if count else np.nan,
+                "max": self.max[i] if count else np.nan,
+                "quantiles": dict(zip(quantiles, self.sketches[i].quantiles(quantiles))),
+                "acf": {lag: acfs[j, i] for j, lag in enumerate(self.lags)},
+            }
+        return columns
+
+    @property
+    def nbytes(self):
+        """Memory held by the accumulators, sketches included"""
+        arrays = (self.count, self.mean, self.m2, self.min, self.max, self.shift, self.lagProducts,
+                  self.lagLeft, self.lagRight, self.lagCount, self.tail)
+        return sum(array.nbytes for array in arrays) + sum(sketch.nbytes for sketch in self.sketches)
+
+
+def summarize_chunks(chunks, lags=DEFAULT_LAGS, quantiles=DEFAULT_QUANTILES):
+    """Summary of a dataset given as successive DataFrame chunks
+
+    The statistics cover the numeric columns after the first (x) one, as
+    decided by the first chunk; values that do not parse as numbers in a
+    later chunk count as missing. Returns {"rows", "x": {"name", "first",
+    "last"}, "columns": {column: statistics}}.
+    """
+    stats = x = None
+    last = None
+    for chunk in chunks:
+        if stats is None:
+            columns = [column for column in chunk.columns[1:] if pd.api.types.is_numeric_dtype(chunk[column])]
+            stats = RunningStats(columns, lags)
+            x = {"name": str(chunk.columns[0]) if len(chunk.columns) else None,
+                 "first": str(chunk.iat[0, 0]) if len(chunk) else None}
+        if len(chunk) == 0 or not len(chunk.columns):
+            continue
+        last = str(chunk.iat[-1, 0])
+        if stats.columns:
+            stats.update(np.column_stack([
+                pd.to_numeric(chunk[column], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+                for column in stats.columns
+            ]))
+        else:
+            stats.rows += len(chunk)
+    if stats is None:
+        return {"rows": 0, "x": {"name": None, "first": None, "last": None}, "columns": {}}
+    x["last"] = last
+    return {"rows": stats.rows, "x": x, "columns": stats.result(quantiles)}
+
+
+def csv_chunks(path, chunkRows=CHUNK_ROWS):
+    """DataFrames of up to chunkRows rows of a CSV file, read one at a time"""
+    with pd.read_csv(path, chunksize=chunkRows) as reader:
+        yield from reader
+
+
+def source_chunks(source, chunkRows=CHUNK_ROWS):
+    """DataFrames of up to chunkRows rows of a DataFrame, cache entry or Dataset
+
+    Cache entries are sliced through their memory maps, so only one chunk
+    of each column is in memory at a time.
+    """
+    dataset = source if isinstance(source, Dataset) else Dataset(source, downcast=False)
+    columns = list(dataset.columns)
+    series = {column: dataset[column] for column in columns}
+    rows = len(dataset)
+    for start in range(0, max(rows, 1), chunkRows):
+        yield pd.DataFrame({column: values.iloc[start:start + chunkRows].reset_index(drop=True)
+                            for column, values in series.items()}, columns=columns)
+
+
+def summarize_csv(path, lags=DEFAULT_LAGS, quantiles=DEFAULT_QUANTILES, chunkRows=CHUNK_ROWS):
+    """summarize_chunks of a CSV file read chunkRows rows at a time"""
+    return summarize_chunks(csv_chunks(path, chunkRows), lags, quantiles)
+
+
+def summarize_source(source, lags=DEFAULT_LAGS, quantiles=DEFAULT_QUANTILES, chunkRows=CHUNK_ROWS):
+    """summarize_chunks of a loaded dataset (DataFrame, cache entry or Dataset)"""
+    return summarize_chunks(source_chunks(source, chunkRows), lags, quantiles)
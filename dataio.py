@@ -0,0 +1,268 @@
+"""Dataset reading helpers shared by the GUI and headless scripts"""
+import csv
+import io
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+# Bump whenever read_dataset parses a file differently, so cached parses are redone
+READER_VERSION = 2
+
+# Formats tried, in order, on a sample of a text first column
+DATETIME_FORMATS = (
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%dT%H:%M:%S",
+    "%Y-%m-%d %H:%M:%S.%f",
+    "%Y-%m-%dT%H:%M:%S.%f",
+    "%Y-%m-%d %H:%M",
+    "%Y-%m-%d",
+    "%Y-%m",
+    "%Y/%m/%d",
+    "%m/%d/%Y",
+    "%d/%m/%Y",
+    "%m/%d/%Y %H:%M",
+    "%d/%m/%Y %H:%M",
+    "%m/%d/%Y %H:%M:%S",
+    "%d/%m/%Y %H:%M:%S",
+    "%d.%m.%Y",
+    "%d-%m-%Y",
+)
+
+# Fixed-width formats numpy can parse straight from the bytes of the file
+ISO_FORMATS = {
+    "%Y-%m-%d %H:%M:%S", "%Y-%m-%dT%H:%M:%S", "%Y-%m-%d %H:%M:%S.%f",
+    "%Y-%m-%dT%H:%M:%S.%f", "%Y-%m-%d %H:%M", "%Y-%m-%d", "%Y-%m",
+}
+
+# Numeric first columns: fractional years (1958.2027) and Unix timestamps
+DECIMAL_YEAR = "decimal-year"
+EPOCH_RANGES = {
+    # unit: values spanning roughly 1979 to 2103
+    "s": (3e8, 4.2e9),
+    "ms": (3e11, 4.2e12),
+    "us": (3e14, 4.2e15),
+    "ns": (3e17, 4.2e18),
+}
+
+SAMPLE_SIZE = 256
+
+# Files at least this large take the sampled fast path in read_dataset
+FAST_PATH_BYTES = 1 << 18
+
+# Inferred first-column format by header, so files sharing a schema (daily
+# exports of the same feed, rows appended to a followed file) skip inference
+_schemaFormats = {}
+
+
+def dataset_name(path):
+    """Derive a dataset name from a file path"""
+    return os.path.splitext(os.path.basename(path))[0]
+
+
+def safe_filename(name):
+    """A dataset or column name usable as a file name on every platform"""
+    return re.sub(r'[<>:"/\\|?*\x00-\x1f]+', "_", str(name)).strip(" .") or "_"
+
+
+def sample(values, size=SAMPLE_SIZE):
+    """Up to `size` non-missing values spread evenly over a column"""
+    values = pd.Series(values).dropna()
+    if len(values) > size:
+        values = values.iloc[np.linspace(0, len(values) - 1, size).astype(int)]
+    return values
+
+
+def decimal_years(values):
+    """Convert fractional years (1958.2027) to datetimes"""
+    series = pd.Series(values)
+    years = series.to_numpy(dtype=float, na_value=np.nan)
+    finite = np.isfinite(years)
+    years = np.where(finite, years, 1970)
+    whole = np.floor(years).astype(np.int64)
+    start = (whole - 1970).astype("datetime64[Y]").astype("datetime64[s]")
+    end = (whole - 1969).astype("datetime64[Y]").astype("datetime64[s]")
+    # Rounded to the second: four decimals of a year are only ~50 minutes anyway
+    offset = np.rint((end - start).astype(np.int64) * (years - whole)).astype("timedelta64[s]")
+    result = (start + offset).astype("datetime64[ns]")
+    result[~finite] = np.datetime64("NaT")
+    return pd.Series(result, index=series.index, name=series.name)
+
+
+def parse_datetimes(values, fmt, errors="raise"):
+    """Convert a column to datetimes with a format from infer_datetime_format"""
+    if fmt == DECIMAL_YEAR:
+        if errors == "coerce":
+            values = pd.to_numeric(values, errors="coerce")
+        return decimal_years(values)
+    if fmt.startswith("epoch-"):
+        if errors == "coerce":
+            values = pd.to_numeric(values, errors="coerce")
+        return pd.to_datetime(values, unit=fmt[len("epoch-"):], errors=errors)
+    return pd.to_datetime(values, format=fmt, errors=errors)
+
+
+def _parses(values, fmt):
+    try:
+        parse_datetimes(values, fmt)
+    except (ValueError, TypeError, OverflowError):
+        return False
+    return True
+
+
+def _numeric_datetime_format(values):
+    """DECIMAL_YEAR or an epoch unit for a sorted numeric column in a plausible range"""
+    values = values.to_numpy(dtype=float, na_value=np.nan)
+    values = values[np.isfinite(values)]
+    if values.size == 0 or np.any(np.diff(values) < 0):
+        return None
+    low, high = values[0], values[-1]
+    if 1000 <= low and high < 3000 and np.any(values != np.floor(values)):
+        return DECIMAL_YEAR
+    for unit, (start, stop) in EPOCH_RANGES.items():
+        if start <= low and high < stop:
+            return f"epoch-{unit}"
+    return None
+
+
+def infer_datetime_format(values):
+    """The format a column of timestamps is written in, or None if it is not one
+
+    Text columns are matched against DATETIME_FORMATS on a sample of rows
+    (ISO 8601 with offsets, then any format pandas can guess per element,
+    as a last resort). Numeric columns qualify only when sorted: fractional
+    years between 1000 and 3000, or Unix timestamps in s/ms/us/ns.
+    """
+    values = pd.Series(values)
+    if pd.api.types.is_bool_dtype(values) or pd.api.types.is_datetime64_any_dtype(values):
+        return None
+    if pd.api.types.is_numeric_dtype(values):
+        return _numeric_datetime_format(values)
+
+    values = sample(values)
+    if values.empty or not all(isinstance(value, str) for value in values):
+        return None
+    for fmt in DATETIME_FORMATS + ("ISO8601", "mixed"):
+        if _parses(values, fmt):
+            return fmt
+    return None
+
+
+def datetime_format(columns, values):
+    """infer_datetime_format for a first column, remembered per header
+
+    Only explicit text formats are remembered: a numeric column is cheaper
+    to infer again than to verify, and ISO8601/mixed would verify anything.
+    """
+    values = pd.Series(values)
+    if pd.api.types.is_numeric_dtype(values):
+        return infer_datetime_format(values)
+    key = tuple(str(column) for column in columns)
+    fmt = _schemaFormats.get(key)
+    if fmt is not None and _parses(sample(values), fmt):
+        return fmt
+    fmt = infer_datetime_format(values)
+    if fmt in DATETIME_FORMATS:
+        _schemaFormats[key] = fmt
+    return fmt
+
+
+def _line_starts(buf):
+    """Offsets of the data lines of a CSV (every line after the header)"""
+    starts = np.flatnonzero(buf == ord("\n")) + 1
+    if starts.size and starts[-1] == buf.size:
+        starts = starts[:-1]
+    return starts
+
+
+def _sampled_first_fields(data, starts, fieldCount):
+    """First fields of SAMPLE_SIZE lines spread over the file, or None
+
+    None unless every sampled line is unquoted and has as many fields as
+    the header; anything else is left to the full CSV parser.
+    """
+    picks = np.unique(np.linspace(0, starts.size - 1, min(SAMPLE_SIZE, starts.size)).astype(int))
+    fields = []
+    for pick in picks:
+        stop = starts[pick + 1] if pick + 1 < starts.size else len(data)
+        line = data[starts[pick]:stop].rstrip(b"\r\n")
+        if b'"' in line or line.count(b",") != fieldCount - 1:
+            return None
+        fields.append(line[:line.index(b",")].decode("utf-8", "replace"))
+    return fields
+
+
+def _iso_column(buf, starts, width):
+    """The first field of every data line as datetime64[ns], or None
+
+    Only applies when every line starts with an unquoted field of exactly
+    `width` bytes; the field bytes are gathered one byte position at a time
+    and parsed by numpy without creating a Python string per row.
+    """
+    if starts[-1] + width >= buf.size or not np.all(buf[starts + width] == ord(",")):
+        return None
+    fields = np.empty((starts.size, width), dtype=np.uint8)
+    for position in range(width):
+        fields[:, position] = buf[starts + position]
+    try:
+        return fields.view(f"S{width}").ravel().astype("datetime64[ns]")
+    except ValueError:
+        return None
+
+
+def read_dataset(path):
+    """Read a CSV file and convert its first column to datetime if it holds timestamps
+
+    The format is inferred once from a sample and the whole column parsed
+    with it. In larger files, ISO timestamps of fixed width skip pandas'
+    text column entirely and are parsed by numpy from the raw bytes.
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) >= FAST_PATH_BYTES:
+        df = _read_iso_dataset(data)
+        if df is not None:
+            return df
+    return _convert_first_column(pd.read_csv(io.BytesIO(data)))
+
+
+def _read_iso_dataset(data):
+    """read_dataset for files whose first column is fixed-width ISO timestamps, else None"""
+    buf = np.frombuffer(data, dtype=np.uint8)
+    starts = _line_starts(buf)
+    if starts.size == 0:
+        return None
+    header = next(csv.reader([data[:starts[0]].decode("utf-8-sig", "replace").rstrip("\r\n")]))
+    if len(header) < 2 or not header[0] or header.count(header[0]) > 1:
+        return None
+    fields = _sampled_first_fields(data, starts, len(header))
+    if fields is None or len({len(field) for field in fields}) != 1:
+        return None
+    if datetime_format(header, fields) not in ISO_FORMATS:
+        return None
+
+    first = _iso_column(buf, starts, len(fields[0]))
+    if first is None:
+        return None
+    rest = pd.read_csv(io.BytesIO(data), usecols=range(1, len(header)))
+    if len(rest) != len(first):
+        return None
+    rest.insert(0, header[0], first)
+    return rest
+
+
+def _convert_first_column(df, fmt=None):
+    """Parse the first column as datetimes when it holds timestamps"""
+    if df.empty:
+        return df
+    column = df.columns[0]
+    if fmt is None:
+        fmt = datetime_format(df.columns, df[column])
+    if fmt is not None:
+        try:
+            df[column] = parse_datetimes(df[column], fmt)
+        except (ValueError, TypeError, OverflowError):
+            # The sampled rows matched but some other row does not: keep the text
+            pass
+    return df
@@ -0,0 +1,271 @@
+"""Columnar on-disk cache of parsed datasets
+
+Each parsed CSV is stored as one ``.npy`` file per column plus a JSON
+manifest, in a directory named after a hash of the file content and the
+reader version. Loading an unchanged file memory-maps the column files
+instead of parsing the CSV again; a changed file hashes to a new entry, and
+the entry it replaces is removed when the new one is written. Long numeric
+columns also get a ``.pyramid.npy`` file holding their decimation pyramid.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from dataio import READER_VERSION, read_dataset
+from pyramid import MIN_ROWS as PYRAMID_MIN_ROWS, Pyramid
+
+FORMAT_VERSION = 1
+MANIFEST = "manifest.json"
+
+
+def default_cache_dir():
+    """Per-user cache directory, overridable with STATVIZ_CACHE_DIR"""
+    if os.environ.get("STATVIZ_CACHE_DIR"):
+        return os.environ["STATVIZ_CACHE_DIR"]
+    base = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "statistics-visualization-tool", "datasets")
+
+
+def file_digest(path, chunkSize=1 << 20):
+    """Hash of the file content and of everything that affects how it is parsed"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{FORMAT_VERSION}:{READER_VERSION}:".encode())
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunkSize), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _write_column(series, directory, stem):
+    """Save one column as typed .npy file(s) and return its manifest entry"""
+    entry = {"name": series.name, "file": f"{stem}.npy"}
+
+    if isinstance(series.dtype, pd.DatetimeTZDtype):
+        entry["kind"] = "datetime"
+        entry["tz"] = str(series.dtype.tz)
+        values = series.dt.tz_convert("UTC").dt.tz_localize(None).to_numpy(dtype="datetime64[ns]")
+    elif pd.api.types.is_datetime64_any_dtype(series) or pd.api.types.is_timedelta64_dtype(series):
+        entry["kind"] = "datetime"
+        values = series.to_numpy()
+    elif pd.api.types.is_bool_dtype(series) or pd.api.types.is_numeric_dtype(series):
+        entry["kind"] = "numeric"
+        values = series.to_numpy()
+        if values.dtype == object:
+            # Nullable extension dtypes: keep the values, missing become NaN
+            values = series.to_numpy(dtype=float, na_value=np.nan)
+    else:
+        # Text: fixed-width unicode, which can be memory-mapped, plus a
+        # mask restoring the missing values
+        entry["kind"] = "text"
+        missing = series.isna().to_numpy()
+        values = series.astype(str).to_numpy(dtype=str)
+        if missing.any():
+            entry["mask"] = f"{stem}.mask.npy"
+            np.save(os.path.join(directory, entry["mask"]), missing)
+
+    np.save(os.path.join(directory, entry["file"]), values, allow_pickle=False)
+    return entry
+
+
+def _pyramid_file(entry):
+    """File name of the pyramid of a column, next to its values"""
+    return entry["file"][:-len(".npy")] + ".pyramid.npy"
+
+
+def _load_values(entry, directory, mmap):
+    """Stored array of a column, as a plain read-only view of the mapping
+
+    np.memmap results of every later operation would otherwise keep the
+    subclass around.
+    """
+    values = np.load(os.path.join(directory, entry["file"]),
+                     mmap_mode="r" if mmap else None, allow_pickle=False)
+    return values.view(np.ndarray)
+
+
+def _read_column(entry, directory, mmap):
+    """Rebuild one column from its manifest entry"""
+    values = _load_values(entry, directory, mmap)
+
+    if entry["kind"] == "datetime" and "tz" in entry:
+        return pd.Series(values, name=entry["name"], copy=False).dt.tz_localize("UTC").dt.tz_convert(entry["tz"])
+    if entry["kind"] == "text":
+        series = pd.Series(values.astype(object), name=entry["name"], copy=False)
+        if "mask" in entry:
+            series[np.load(os.path.join(directory, entry["mask"]))] = np.nan
+        return series
+    return pd.Series(values, name=entry["name"], copy=False)
+
+
+class CacheEntry:
+    """A cached dataset whose columns are only read when asked for"""
+    def __init__(self, directory, mmap=True):
+        self.directory = directory
+        self.mmap = mmap
+        with open(os.path.join(directory, MANIFEST), encoding="utf-8") as f:
+            manifest = json.load(f)
+        self.rows = manifest["rows"]
+        self._columns = {entry["name"]: entry for entry in manifest["columns"]}
+        self._index = manifest.get("index")
+
+    @property
+    def columns(self):
+        """Column names in file order"""
+        return pd.Index(list(self._columns))
+
+    def dtype(self, column):
+        """dtype of a column as read_dataset produced it, read from the file header only"""
+        entry = self._columns[column]
+        if entry["kind"] == "text":
+            return np.dtype(object)
+        if "tz" in entry:
+            return pd.DatetimeTZDtype("ns", entry["tz"])
+        return _load_values(entry, self.directory, mmap=True).dtype
+
+    def nbytes(self, column):
+        """Size of a column on disk"""
+        entry = self._columns[column]
+        files = [entry["file"]] + ([entry["mask"]] if "mask" in entry else [])
+        return sum(os.path.getsize(os.path.join(self.directory, name)) for name in files)
+
+    def read(self, column):
+        """One column as a Series, memory-mapped unless it holds text"""
+        return _read_column(self._columns[column], self.directory, self.mmap)
+
+    def pyramid(self, column):
+        """Decimation pyramid of a numeric column, built and saved on first use if missing
+
+        Entries written by DatasetCache.store already hold one for every
+        long numeric column; this covers older entries.
+        """
+        path = os.path.join(self.directory, _pyramid_file(self._columns[column]))
+        if os.path.isfile(path):
+            try:
+                return Pyramid.load(path, self.rows, self.mmap)
+            except (OSError, ValueError):
+                pass
+        pyramid = Pyramid.build(self.read(column).to_numpy(dtype=float, na_value=np.nan))
+        try:
+            pyramid.save(path)
+        except OSError:
+            pass
+        return pyramid
+
+    def frame(self):
+        """The whole dataset as a DataFrame"""
+        columns = [self.read(column) for column in self._columns]
+        df = pd.DataFrame({series.name: series for series in columns}, copy=False)
+        if self._index:
+            levels = [_read_column(entry, self.directory, self.mmap) for entry in self._index]
+            if len(levels) == 1:
+                df.index = pd.Index(levels[0], name=levels[0].name)
+            else:
+                df.index = pd.MultiIndex.from_arrays(levels)
+        return df
+
+
+class DatasetCache:
+    """Content-hash keyed store of parsed datasets under one root directory"""
+    def __init__(self, root=None):
+        self.root = root or default_cache_dir()
+
+    def entryDir(self, digest):
+        """Directory holding the entry for a content digest"""
+        return os.path.join(self.root, digest)
+
+    def lookup(self, path):
+        """Return (digest, cached) for a CSV file, where cached tells whether it is stored"""
+        digest = file_digest(path)
+        return digest, os.path.isfile(os.path.join(self.entryDir(digest), MANIFEST))
+
+    def store(self, path, df, digest):
+        """Write a parsed dataset and drop older entries of the same source file
+
+        The entry is written to a temporary directory and renamed into place,
+        so concurrent readers never see a partial entry.
+        """
+        os.makedirs(self.root, exist_ok=True)
+        source = os.path.abspath(path)
+        staging = tempfile.mkdtemp(prefix=".tmp-", dir=self.root)
+        try:
+            columns = [_write_column(df.iloc[:, i], staging, i) for i in range(df.shape[1])]
+            if len(df) >= PYRAMID_MIN_ROWS:
+                for i, entry in enumerate(columns):
+                    if entry["kind"] == "numeric":
+                        values = df.iloc[:, i].to_numpy(dtype=float, na_value=np.nan)
+                        Pyramid.build(values).save(os.path.join(staging, _pyramid_file(entry)))
+            manifest = {"format": FORMAT_VERSION, "source": source, "rows": len(df), "columns": columns}
+            # Files with more fields than header names are read with the
+            # leading fields as index, which has to survive the round trip
+            if not df.index.equals(pd.RangeIndex(len(df))):
+                manifest["index"] = [
+                    _write_column(pd.Series(df.index.get_level_values(i), name=name), staging, f"index{i}")
+                    for i, name in enumerate(df.index.names)
+                ]
+            with open(os.path.join(staging, MANIFEST), "w", encoding="utf-8") as f:
+                json.dump(manifest, f)
+            os.replace(staging, self.entryDir(digest))
+        except OSError:
+            shutil.rmtree(staging, ignore_errors=True)
+            # Another process stored the same content first
+            if not os.path.isdir(self.entryDir(digest)):
+                raise
+
+        self._dropStale(source, digest)
+
+    def entry(self, digest, mmap=True):
+        """Open a cached dataset without reading any of its columns"""
+        return CacheEntry(self.entryDir(digest), mmap)
+
+    def load(self, digest, mmap=True):
+        """Return the cached dataset, its columns memory-mapped by default"""
+        return self.entry(digest, mmap).frame()
+
+    def size(self):
+        """Total size of the cache in bytes"""
+        total = 0
+        for directory, _, files in os.walk(self.root):
+            total += sum(os.path.getsize(os.path.join(directory, name)) for name in files)
+        return total
+
+    def clear(self):
+        """Remove every cached dataset"""
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def _dropStale(self, source, digest):
+        """Remove entries of the same source file with a different content hash"""
+        for name in os.listdir(self.root):
+            if name == digest or name.startswith("."):
+                continue
+            try:
+                with open(os.path.join(self.entryDir(name), MANIFEST), encoding="utf-8") as f:
+                    stale = json.load(f).get("source") == source
+            except (OSError, ValueError):
+                continue
+            if stale:
+                shutil.rmtree(self.entryDir(name), ignore_errors=True)
+
+
+def cache_dataset(path, root=None):
+    """Parse a CSV into the cache unless an identical file is already there
+
+    Meant to run in worker processes: returns the digest to load the
+    dataset from, or the parsed DataFrame itself when the cache cannot be
+    written.
+    """
+    cache = DatasetCache(root)
+    digest, cached = cache.lookup(path)
+    if cached:
+        return digest
+
+    df = read_dataset(path)
+    try:
+        cache.store(path, df, digest)
+    except OSError:
+        return df
+    return digest
@@ -0,0 +1,286 @@
+"""Lazily materialized datasets behind the main window
+
+A Dataset wraps either a cache entry (columns memory-mapped from disk) or
+a DataFrame, and only pulls into memory the float values of the columns
+that are actually plotted. Everything else stays on disk, or in the
+DataFrame it came from, until asked for.
+"""
+import numpy as np
+import pandas as pd
+
+from datasetcache import CacheEntry
+from pyramid import MIN_ROWS as PYRAMID_MIN_ROWS, Pyramid
+
+
+def downcast_float(values, resolution=0.01):
+    """Return values as float32 when that is lossless enough, else as float64
+
+    "Enough" means the float32 rounding error stays below `resolution`
+    times the smallest change between consecutive values, so the series
+    keeps every step it actually takes: temperatures in tenths of a degree
+    or counts below 2**24 narrow, epoch timestamps or six-figure prices
+    quoted in cents do not.
+    """
+    values = np.asarray(values, dtype=float)
+    with np.errstate(invalid="ignore", over="ignore"):
+        narrow = values.astype(np.float32)
+        error = np.abs(narrow - values)
+    if not np.isfinite(narrow[np.isfinite(values)]).all():
+        return values
+
+    finite = np.isfinite(error)
+    maxError = error[finite].max() if finite.any() else 0.0
+    if maxError == 0:
+        return narrow
+
+    steps = np.abs(np.diff(values))
+    steps = steps[steps > 0]
+    if steps.size and maxError <= resolution * steps.min():
+        return narrow
+    return values
+
+
+class Dataset:
+    """Column access to a loaded dataset without holding it all in memory
+
+    Indexing (`dataset[column]`) returns the column as parsed, backed by
+    the memory map when the dataset came from the cache. `values(column)`
+    returns the float values used for plotting and analysis; those are
+    read into memory once, narrowed to float32 where downcast_float allows,
+    and kept until `release` drops them.
+    """
+    def __init__(self, source, downcast=True):
+        self.source = source
+        self.downcast = downcast
+        self._materialized = {}
+        self._pyramids = {}
+
+    @property
+    def columns(self):
+        """Column names, the x column first"""
+        return self.source.columns
+
+    @property
+    def empty(self):
+        """True when there are no rows or no columns"""
+        return len(self) == 0 or len(self.columns) == 0
+
+    def __len__(self):
+        if isinstance(self.source, CacheEntry):
+            return self.source.rows
+        return len(self.source)
+
+    def __getitem__(self, column):
+        if isinstance(self.source, CacheEntry):
+            return self.source.read(column)
+        return self.source[column]
+
+    def dtype(self, column):
+        """dtype of a column, without reading it"""
+        if isinstance(self.source, CacheEntry):
+            return self.source.dtype(column)
+        return self.source[column].dtype
+
+    def isNumeric(self, column):
+        """True for columns that can be plotted as values"""
+        return pd.api.types.is_numeric_dtype(self.dtype(column))
+
+    def values(self, column):
+        """Float values of a numeric column (NaN where missing), materialized on first use"""
+        if column not in self._materialized:
+            values = self[column].to_numpy(dtype=float, na_value=np.nan)
+            self._materialized[column] = downcast_float(values) if self.downcast else values
+        return self._materialized[column]
+
+    def block(self, columns):
+        """Float64 (rows, columns) array of numeric columns side by side, for transforms of all of them at once"""
+        block = np.empty((len(self), len(columns)))
+        for i, column in enumerate(columns):
+            block[:, i] = self.values(column)
+        return block
+
+    def pyramid(self, column):
+        """Decimation pyramid of a long numeric column, or None for short ones
+
+        Cached datasets map the one stored next to the column; others build
+        it in memory on first use.
+        """
+        if len(self) < PYRAMID_MIN_ROWS or not self.isNumeric(column):
+            return None
+        if column not in self._pyramids:
+            if isinstance(self.source, CacheEntry):
+                self._pyramids[column] = self.source.pyramid(column)
+            else:
+                self._pyramids[column] = Pyramid.build(self.values(column))
+        return self._pyramids[column]
+
+    def release(self, keep=()):
+        """Drop the materialized values of every column not in keep"""
+        for column in [column for column in self._materialized if column not in keep]:
+            del self._materialized[column]
+        for column in [column for column in self._pyramids if column not in keep]:
+            del self._pyramids[column]
+
+    def frame(self):
+        """The whole dataset as a DataFrame"""
+        if isinstance(self.source, CacheEntry):
+            return self.source.frame()
+        return self.source
+
+    def portable(self):
+        """The cache entry when there is one, else the DataFrame: what a worker process can map or unpickle"""
+        if isinstance(self.source, CacheEntry):
+            return self.source
+        return self.frame()
+
+    def memoryUsage(self):
+        """Bytes held in memory and bytes left on disk (memory-mapped) for this dataset"""
+        resident = sum(values.nbytes for values in self._materialized.values())
+        narrowed = sum(values.nbytes for values in self._materialized.values() if values.dtype == np.float32)
+        if isinstance(self.source, CacheEntry):
+            mapped = sum(self.source.nbytes(column) for column in self.columns)
+        else:
+            mapped = 0
+            resident += int(self.source.memory_usage(deep=True).sum())
+        return {
+            "rows": len(self),
+            "columns": len(self.columns),
+            "materialized": list(self._materialized),
+            "resident": resident,
+            "mapped": mapped,
+            # float32 columns take half of what float64 would
+            "saved": narrowed,
+        }
+
+
+class GrowingArray:
+    """Array with amortized O(1) appends
+
+    view() is the filled part, without copying; a view taken before an
+    append that reallocates keeps showing the old values.
+    """
+    def __init__(self, values):
+        values = np.asarray(values)
+        self.size = len(values)
+        self._data = np.empty(max(2 * self.size, 1024), dtype=values.dtype)
+        self._data[:self.size] = values
+
+    @property
+    def dtype(self):
+        return self._data.dtype
+
+    @property
+    def nbytes(self):
+        return self._data.nbytes
+
+    def extend(self, values):
+        values = np.asarray(values, dtype=self._data.dtype)
+        needed = self.size + len(values)
+        if needed > len(self._data):
+            data = np.empty(max(needed, 2 * len(self._data)), dtype=self._data.dtype)
+            data[:self.size] = self._data[:self.size]
+            self._data = data
+        self._data[self.size:needed] = values
+        self.size = needed
+
+    def view(self):
+        return self._data[:self.size]
+
+
+class LiveDataset(Dataset):
+    """A dataset that rows keep being appended to
+
+    Every column is held in memory in a GrowingArray (numeric ones as
+    float64), so appending costs O(rows appended) and reads are views.
+    """
+    def __init__(self, frame):
+        super().__init__(frame, downcast=False)
+        self._columns = frame.columns
+        self._arrays = {}
+        for column in frame.columns:
+            series = frame[column]
+            if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+                values = series.to_numpy(dtype=float, na_value=np.nan)
+            else:
+                values = series.to_numpy()
+            self._arrays[column] = GrowingArray(values)
+        self.source = None
+
+    @property
+    def columns(self):
+        return self._columns
+
+    def __len__(self):
+        return self._arrays[self._columns[0]].size if len(self._columns) else 0
+
+    def __getitem__(self, column):
+        return pd.Series(self._arrays[column].view(), name=column, copy=False)
+
+    def dtype(self, column):
+        return self._arrays[column].dtype
+
+    def values(self, column):
+        array = self._arrays[column]
+        if array.dtype == np.float64:
+            return array.view()
+        return array.view().astype(float)
+
+    def pyramid(self, column):
+        """None: a pyramid would be outdated by the next append"""
+        return None
+
+    def release(self, keep=()):
+        """Nothing to release: the arrays are the data"""
+
+    def append(self, frame):
+        """Append rows; columns missing from frame are filled with missing values
+
+        A bool column is promoted to float64 (1.0/0.0) as soon as missing or
+        non-bool values are appended to it, since bool has no missing value.
+        """
+        rows = len(frame)
+        for column, array in list(self._arrays.items()):
+            if array.dtype == bool and not (column in frame and pd.api.types.is_bool_dtype(frame[column])):
+                array = self._arrays[column] = GrowingArray(array.view().astype(float))
+            if column in frame:
+                values = frame[column].to_numpy()
+                if array.dtype == np.float64:
+                    values = frame[column].to_numpy(dtype=float, na_value=np.nan)
+            elif array.dtype.kind in "mM":
+                values = np.full(rows, np.datetime64("NaT"), dtype=array.dtype)
+            elif array.dtype == object:
+                values = np.full(rows, None, dtype=object)
+            else:
+                values = np.full(rows, np.nan)
+            array.extend(values)
+
+    def frame(self):
+        return pd.DataFrame({column: self[column] for column in self._columns}, copy=False)
+
+    def memoryUsage(self):
+        resident = sum(array.nbytes for array in self._arrays.values())
+        return {
+            "rows": len(self),
+            "columns": len(self._columns),
+            "materialized": list(self._columns),
+            "resident": resident,
+            "mapped": 0,
+            "saved": 0,
+        }
+
+
+class DatasetStore(dict):
+    """Loaded datasets by name"""
+    def add(self, name, source):
+        """Wrap a DataFrame or cache entry under a unique name and return the name"""
+        original = name
+        counter = 1
+        while name in self:
+            name = f"{original}_{counter}"
+            counter += 1
+        self[name] = source if isinstance(source, Dataset) else Dataset(source)
+        return name
+
+    def memoryUsage(self):
+        """memoryUsage() of every dataset, by name"""
+        return {name: dataset.memoryUsage() for name, dataset in self.items()}
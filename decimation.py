@@ -0,0 +1,72 @@
+"""Min/max decimation of long series for on-screen plotting
+
+Only the minimum and maximum sample of each pixel-wide bucket can be told
+apart on screen, so keeping those two points per bucket draws the same
+envelope as the full series with about 2 * width points, peaks included.
+"""
+import numpy as np
+
+
+def visible_range(xnum, xlim):
+    """Return the [start, stop) row range of a sorted axis inside xlim
+
+    One extra row is kept on each side so lines reach the axes edges.
+    """
+    start = np.searchsorted(xnum, xlim[0], side="left")
+    stop = np.searchsorted(xnum, xlim[1], side="right")
+    return max(start - 1, 0), min(stop + 1, len(xnum))
+
+
+def _bucket_argext(y, size, argext):
+    """Apply argmin/argmax to consecutive buckets of `size` rows"""
+    rows = len(y) // size
+    body = y[:rows * size].reshape(rows, size)
+    idx = argext(body, axis=1) + np.arange(rows) * size
+    if rows * size < len(y):
+        idx = np.r_[idx, rows * size + argext(y[rows * size:])]
+    return idx
+
+
+def minmax_indices(y, buckets):
+    """Return sorted row indices of the min and max of each bucket of y"""
+    n = len(y)
+    if n <= 2 * buckets:
+        return np.arange(n)
+
+    y = np.asarray(y, dtype=float)
+    size = -(-n // buckets)
+
+    # NaN would win both argmin and argmax, so hide gaps only when present
+    nan = np.isnan(y)
+    if nan.any():
+        low = _bucket_argext(np.where(nan, np.inf, y), size, np.argmin)
+        high = _bucket_argext(np.where(nan, -np.inf, y), size, np.argmax)
+    else:
+        low = _bucket_argext(y, size, np.argmin)
+        high = _bucket_argext(y, size, np.argmax)
+
+    idx = np.sort(np.stack([low, high], axis=1), axis=1).ravel()
+    idx = idx[np.r_[True, np.diff(idx) != 0]]
+
+    # Keep the end points so the line spans the whole range
+    if idx[0] != 0:
+        idx = np.r_[0, idx]
+    if idx[-1] != n - 1:
+        idx = np.r_[idx, n - 1]
+    return idx
+
+
+def decimate_indices(xnum, y, width, xlim=None, is_sorted=True, pyramid=None):
+    """Return the rows to draw for a series shown `width` pixels wide
+
+    xnum is the x axis in plot units. When xlim is given and the axis is
+    sorted, only the visible rows are decimated so zooming in reveals detail.
+    With the series' pyramid.Pyramid, the buckets come from its levels
+    instead of from every visible row.
+    """
+    start, stop = 0, len(y)
+    if xlim is not None and is_sorted:
+        start, stop = visible_range(xnum, xlim)
+    if pyramid is not None:
+        return pyramid.minmax_indices(y, start, stop, max(int(width), 1))
+    return minmax_indices(y[start:stop], max(int(width), 1)) + start
@@ -0,0 +1,329 @@
+"""Seasonal decomposition of series into trend, seasonal and residual parts
+
+Every method takes a (rows, columns) block of float values (see
+transforms.as_block) and decomposes all of its columns in one call,
+returning a (3, rows, columns) array holding the trend, seasonal and
+residual blocks:
+
+    trend, seasonal, residual = decompose(block, "stl", detect_period(block, x))
+
+    additive        classical decomposition: centered moving-average trend,
+    multiplicative  the mean of each phase of the season as the seasonal
+                    part; vectorized over the whole block
+    stl             STL (Cleveland et al., 1990): LOESS smoothing of the
+                    cycle-subseries and of the deseasonalized trend,
+                    iterated; compiled with numba when it is installed
+
+Missing values are left out of every average and LOESS fit, so trend and
+seasonal parts are defined at missing rows; only the residual is missing.
+"""
+import math
+
+import numpy as np
+import pandas as pd
+
+from autocorrelation import acf, confidence_bound
+from holtwinters import infer_period, njit
+from transforms import as_block
+
+METHODS = ("additive", "multiplicative", "stl")
+
+# Period detection looks at the autocorrelation of at most this many rows,
+# and takes peaks below MIN_SEASONAL_ACF for chance (out of hundreds of lags,
+# some always clear the white-noise band)
+PERIOD_SAMPLE_ROWS = 1 << 20
+MIN_SEASONAL_ACF = 0.2
+
+
+def detect_period(block, index=None, maxPeriod=None):
+    """Seasonal period shared by the columns of block, or None
+
+    Datetime x values give the usual cycle of their spacing (as for the
+    Holt-Winters overlays). Otherwise the period is the lag of the highest
+    pronounced peak of the autocorrelation of the differenced columns,
+    averaged over the columns.
+    """
+    block = as_block(block)
+    rows = len(block)
+    period = infer_period(pd.Index(index)) if index is not None else None
+    if period is not None and rows >= 2 * period:
+        return period
+
+    sample = np.diff(block[:PERIOD_SAMPLE_ROWS], axis=0)
+    maxPeriod = min(maxPeriod or rows // 2, rows // 2, len(sample) - 1)
+    if maxPeriod < 3:
+        return None
+    with np.errstate(invalid="ignore"):
+        r = np.nanmean(acf(sample, maxPeriod + 1), axis=1) if sample.shape[1] else np.empty(0)
+    if not np.isfinite(r).any():
+        return None
+    lags = np.arange(2, maxPeriod + 1)
+    threshold = max(confidence_bound(len(sample)), MIN_SEASONAL_ACF)
+    peaks = (r[lags] >= r[lags - 1]) & (r[lags] > r[lags + 1]) & (r[lags] > threshold)
+    if not peaks.any():
+        return None
+    return int(lags[peaks][np.argmax(r[lags][peaks])])
+
+
+def _centered_average(block, period):
+    """Centered moving average over one period (2 x period for even periods) of the finite values
+
+    Window sums and counts of finite values are differences of cumulative
+    sums, so long periods cost no more than short ones; the columns are
+    centered on their mean first to keep the cumulative sums small. The
+    average is missing only where its window holds no finite value.
+    """
+    rows, columns = block.shape
+    out = np.full(block.shape, np.nan)
+    if rows < period + 1 - period % 2:
+        return out
+    finite = np.isfinite(block)
+    counts = finite.sum(axis=0)
+    shift = np.where(finite, block, 0.0).sum(axis=0) / np.maximum(counts, 1)
+    sums = np.zeros((rows + 1, columns))
+    np.cumsum(np.where(finite, block - shift, 0.0), axis=0, out=sums[1:])
+    seen = np.zeros((rows + 1, columns), dtype=np.int64)
+    np.cumsum(finite, axis=0, out=seen[1:])
+
+    # Sum and number of the finite values of rows i .. i + period - 1
+    windowSums = sums[period:] - sums[:-period]
+    windowCounts = seen[period:] - seen[:-period]
+    if period % 2 == 0:
+        # Pooling neighbouring windows centers them on a row, with half
+        # weight on both ends as in the 2 x period average
+        windowSums = windowSums[:-1] + windowSums[1:]
+        windowCounts = windowCounts[:-1] + windowCounts[1:]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = np.where(windowCounts > 0, windowSums / windowCounts, np.nan)
+    out[period // 2:period // 2 + len(means)] = means + shift
+    return out
+
+
+def _phase_means(values, period):
+    """(period, columns) means of the finite values at each phase of the season"""
+    rows, columns = values.shape
+    cycles = -(-rows // period)
+    padded = np.full((cycles * period, columns), np.nan)
+    padded[:rows] = values
+    padded = padded.reshape(cycles, period, columns)
+    finite = np.isfinite(padded)
+    counts = finite.sum(axis=0)
+    sums = np.where(finite, padded, 0.0).sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, sums / counts, np.nan)
+
+
+def classical(block, period, multiplicative=False):
+    """Classical decomposition of every column of block
+
+    Multiplicative decomposition falls back to additive for columns with
+    non-positive values. The trend is missing for the half period at both
+    ends, and so is the residual.
+    """
+    block = as_block(block)
+    rows = len(block)
+    trend = _centered_average(block, period)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ratio = multiplicative & (np.nanmin(np.where(np.isfinite(block), block, np.inf), axis=0) > 0)
+        detrended = np.where(ratio, block / trend, block - trend)
+        phases = _phase_means(detrended, period)
+        # Seasonal indices average to one (ratios) or zero (differences) over a season
+        phases = np.where(ratio, phases / np.nanmean(phases, axis=0), phases - np.nanmean(phases, axis=0))
+        seasonal = np.tile(phases, (-(-rows // period), 1))[:rows]
+        residual = np.where(ratio, block / (trend * seasonal), block - trend - seasonal)
+    return np.stack((trend, seasonal, residual))
+
+
+@njit(cache=True)
+def _loess_point(y, weights, q, x, left, right, scratch):
+    # Tricube-weighted local linear fit of y[left:right] at position x, as in
+    # the original STL Fortran (stlest); NaN when no point has any weight
+    n = len(y)
+    h = max(x - left, right - 1 - x)
+    if q > n:
+        h += (q - n) // 2
+    total = 0.0
+    for j in range(left, right):
+        r = abs(j - x)
+        weight = 0.0
+        if r <= 0.999 * h:
+            weight = weights[j]
+            if r > 0.001 * h:
+                weight *= (1.0 - (r / h) ** 3) ** 3
+        scratch[j - left] = weight
+        total += weight
+    if total <= 0.0:
+        return np.nan
+
+    center = 0.0
+    for j in range(left, right):
+        scratch[j - left] /= total
+        center += scratch[j - left] * j
+    if h > 0.0:
+        spread = 0.0
+        for j in range(left, right):
+            spread += scratch[j - left] * (j - center) ** 2
+        if math.sqrt(spread) > 0.001 * (n - 1):
+            slope = (x - center) / spread
+            for j in range(left, right):
+                scratch[j - left] *= slope * (j - center) + 1.0
+    value = 0.0
+    for j in range(left, right):
+        value += scratch[j - left] * y[j]
+    return value
+
+
+@njit(cache=True)
+def _window(n, q, x):
+    # The q points nearest to position x (all of them when q >= n)
+    if q >= n:
+        return 0, n
+    left = min(max(int(round(x)) - q // 2, 0), n - q)
+    return left, left + q
+
+
+@njit(cache=True)
+def _loess(y, weights, q, jump, out, scratch):
+    # LOESS at every position 0..n-1, fitted every `jump` positions and
+    # linearly interpolated in between
+    n = len(y)
+    if n == 0:
+        return
+    jump = max(1, min(jump, n - 1))
+    last = -1
+    i = 0
+    while True:
+        left, right = _window(n, q, i)
+        out[i] = _loess_point(y, weights, q, float(i), left, right, scratch)
+        if last >= 0:
+            for k in range(last + 1, i):
+                fraction = (k - last) / (i - last)
+                out[k] = out[last] + fraction * (out[i] - out[last])
+        last = i
+        if i == n - 1:
+            break
+        i = min(i + jump, n - 1)
+
+
+@njit(cache=True)
+def _moving_average(x, length, out):
+    # out[i] = mean of x[i:i + length], by a running sum
+    total = 0.0
+    for i in range(length):
+        total += x[i]
+    out[0] = total / length
+    for i in range(1, len(x) - length + 1):
+        total += x[i + length - 1] - x[i - 1]
+        out[i] = total / length
+
+
+@njit(cache=True)
+def _stl(block, period, ns, nt, nl, inner, outer, out):
+    rows, columns = block.shape
+    cycles = -(-rows // period)
+    y = np.empty(rows)
+    mask = np.empty(rows)
+    weights = np.empty(rows)
+    trend = np.empty(rows)
+    seasonal = np.empty(rows)
+    work = np.empty(rows)
+    cycle = np.empty(rows + 2 * period)
+    low1 = np.empty(rows + period + 1)
+    low2 = np.empty(rows + 2)
+    low3 = np.empty(rows)
+    lowPass = np.empty(rows)
+    ones = np.ones(rows)
+    sub = np.empty(cycles)
+    subWeights = np.empty(cycles)
+    subSmooth = np.empty(cycles)
+    scratch = np.empty(max(ns, nt, nl))
+    residual = np.empty(rows)
+
+    for c in range(columns):
+        for t in range(rows):
+            value = block[t, c]
+            finite = value == value and abs(value) != np.inf
+            y[t] = value if finite else 0.0
+            mask[t] = 1.0 if finite else 0.0
+            weights[t] = mask[t]
+            trend[t] = 0.0
+
+        for iteration in range(outer + 1):
+            for _ in range(inner):
+                # Cycle-subseries smoothing of the detrended series, one
+                # period extended at both ends
+                for phase in range(period):
+                    m = 0
+                    for t in range(phase, rows, period):
+                        sub[m] = y[t] - trend[t]
+                        subWeights[m] = weights[t]
+                        m += 1
+                    _loess(sub[:m], subWeights[:m], ns, max(1, -(-ns // 10)), subSmooth[:m], scratch)
+                    for j in range(m):
+                        cycle[phase + period * (j + 1)] = subSmooth[j]
+                    left, right = _window(m, ns, -1.0)
+                    cycle[phase] = _loess_point(sub[:m], subWeights[:m], ns, -1.0, left, right, scratch)
+                    left, right = _window(m, ns, float(m))
+                    cycle[phase + period * (m + 1)] = _loess_point(sub[:m], subWeights[:m], ns, float(m),
+                                                                   left, right, scratch)
+
+                # Low-pass filter of the cycle-subseries: removing it keeps
+                # the trend out of the seasonal part
+                _moving_average(cycle, period, low1)
+                _moving_average(low1, period, low2)
+                _moving_average(low2, 3, low3)
+                _loess(low3, ones, nl, max(1, -(-nl // 10)), lowPass, scratch)
+                for t in range(rows):
+                    seasonal[t] = cycle[period + t] - lowPass[t]
+                    work[t] = y[t] - seasonal[t]
+                _loess(work, weights, nt, max(1, -(-nt // 10)), trend, scratch)
+
+            if iteration < outer:
+                # Robustness weights: bisquare of the residual over six median absolute residuals
+                count = 0
+                for t in range(rows):
+                    if mask[t] > 0.0:
+                        residual[count] = abs(y[t] - trend[t] - seasonal[t])
+                        count += 1
+                h = 6.0 * np.median(residual[:count]) if count else 0.0
+                for t in range(rows):
+                    u = abs(y[t] - trend[t] - seasonal[t]) / h if h > 0.0 else 0.0
+                    weight = 1.0 if u <= 0.001 else (1.0 - u * u) ** 2 if u <= 0.999 else 0.0
+                    weights[t] = mask[t] * weight
+
+        for t in range(rows):
+            out[0, t, c] = trend[t]
+            out[1, t, c] = seasonal[t]
+            out[2, t, c] = y[t] - trend[t] - seasonal[t] if mask[t] > 0.0 else np.nan
+    return out
+
+
+def _odd(value):
+    """Smallest odd integer >= value"""
+    value = int(math.ceil(value))
+    return value if value % 2 else value + 1
+
+
+def stl(block, period, seasonal=7, robust=False):
+    """STL decomposition of every column of block
+
+    seasonal is the (odd) LOESS window of the cycle-subseries; the trend
+    and low-pass windows follow Cleveland et al.'s defaults. Robust fits
+    downweight outliers over 15 extra passes.
+    """
+    block = as_block(block)
+    ns = _odd(max(seasonal, 3))
+    nt = _odd(1.5 * period / (1.0 - 1.5 / ns))
+    nl = _odd(period)
+    inner, outer = (5, 15) if robust else (2, 0)
+    return _stl(block, period, ns, nt, nl, inner, outer, np.empty((3,) + block.shape))
+
+
+def decompose(block, method, period):
+    """Decomposition of every column of block by one of METHODS, as a (3, rows, columns) array"""
+    block = as_block(block)
+    if period is None or period < 2 or len(block) < 2 * period:
+        raise ValueError(f"seasonal decomposition needs at least two full periods of rows (period {period})")
+    if method == "stl":
+        return stl(block, period)
+    return classical(block, period, multiplicative=method == "multiplicative")
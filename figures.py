@@ -0,0 +1,164 @@
+"""Plot styling shared by the GUI canvas and headless exports
+
+Only matplotlib.figure is used here, never pyplot, so importing this module
+does not pick or start a GUI backend.
+"""
+from matplotlib import dates as mdates
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.ticker import FuncFormatter
+import numpy as np
+import pandas as pd
+
+from datasetcache import CacheEntry
+from decimation import decimate_indices
+from transforms import apply_overlay_block
+
+# Colors of the light and dark plot themes
+THEMES = {
+    "light": {
+        "figure": "#ffffff", "axes": "#fafafa", "spines": "#ccc", "text": "#333",
+        "grid": "#ddd", "gridAlpha": 0.3,
+    },
+    "dark": {
+        "figure": "#1e1e2e", "axes": "#2d2d44", "spines": "#6c7086", "text": "#cdd6f4",
+        "grid": "#6c7086", "gridAlpha": 0.15,
+    },
+}
+
+
+def style_axes(ax, theme="light"):
+    """Apply a plot theme to one axes"""
+    colors = THEMES[theme]
+    ax.set_facecolor(colors["axes"])
+    for spine in ax.spines.values():
+        spine.set_color(colors["spines"])
+    ax.tick_params(colors=colors["text"], which="both")
+    ax.xaxis.label.set_color(colors["text"])
+    ax.yaxis.label.set_color(colors["text"])
+    ax.title.set_color(colors["text"])
+    ax.grid(True, alpha=colors["gridAlpha"], color=colors["grid"])
+
+
+def style_figure(fig, theme="light"):
+    """Apply a plot theme to a figure and all of its axes"""
+    fig.patch.set_facecolor(THEMES[theme]["figure"])
+    for ax in fig.axes:
+        style_axes(ax, theme)
+
+
+def agg_figure(nrows=1, ncols=1, figsize=(10, 6), dpi=100, theme="light", **kwargs):
+    """A styled Figure on an Agg canvas, usable without any QApplication"""
+    fig = Figure(figsize=figsize, dpi=dpi)
+    FigureCanvasAgg(fig)
+    fig.subplots(nrows, ncols, **kwargs)
+    style_figure(fig, theme)
+    return fig
+
+
+def plot_values(x):
+    """Return (x to plot, numeric x for decimation, is sorted) for an x column"""
+    x = pd.Series(x)
+    if pd.api.types.is_datetime64_any_dtype(x):
+        values = x.to_numpy(dtype="datetime64[ns]")
+        xnum = mdates.date2num(values)
+    elif pd.api.types.is_numeric_dtype(x):
+        values = xnum = x.to_numpy(dtype=float)
+    else:
+        # Text labels: plot against row positions, the plot labels the ticks
+        values = xnum = np.arange(len(x), dtype=float)
+    is_sorted = len(xnum) < 2 or bool(np.all(np.diff(xnum) >= 0))
+    return values, xnum, is_sorted
+
+
+def axis_kind(x):
+    """"datetime", "numeric" or "text": how an x column is plotted and labelled"""
+    x = pd.Series(x)
+    if pd.api.types.is_datetime64_any_dtype(x):
+        return "datetime"
+    if pd.api.types.is_numeric_dtype(x):
+        return "numeric"
+    return "text"
+
+
+def plot_decimated(ax, xValues, y, width, **kwargs):
+    """Plot a series min/max-decimated to `width` pixel columns"""
+    x, xnum, is_sorted = xValues
+    idx = decimate_indices(xnum, y, width, None, is_sorted)
+    line, = ax.plot(x[idx], y[idx], **kwargs)
+    return line
+
+
+# Styled figures kept per (theme, x kind, size, dpi) in each worker process
+_templates = {}
+
+
+def figure_template(theme="light", kind="datetime", figsize=(12, 7), dpi=100):
+    """A styled single-axes figure, emptied for reuse
+
+    Styling, layout and (for a given kind of x values) the axis units are
+    set up once; later calls only remove the previous plot's artists.
+    """
+    key = (theme, kind, figsize, dpi)
+    if key not in _templates:
+        fig = agg_figure(figsize=figsize, dpi=dpi, theme=theme)
+        fig.subplots_adjust(left=0.07, right=0.98, top=0.93, bottom=0.12)
+        if kind == "datetime":
+            fig.axes[0].tick_params(axis="x", labelrotation=30)
+        _templates[key] = fig
+
+    fig = _templates[key]
+    ax = fig.axes[0]
+    for artist in ax.lines[:] + ax.collections[:]:
+        artist.remove()
+    if ax.get_legend() is not None:
+        ax.get_legend().remove()
+    ax.set_title("")
+    return fig
+
+
+def render_dataset(path, name, source, columns, colors, overlays=(), theme="light",
+                   dpi=150, figsize=(12, 7)):
+    """Render the columns of a dataset and their overlays to an image file
+
+    source is a DataFrame or a CacheEntry, colors maps column -> color and
+    overlays is a sequence of (overlay, line keyword arguments). Returns path.
+    """
+    df = source.frame() if isinstance(source, CacheEntry) else source
+    xColumn = df.columns[0]
+    xValues = plot_values(df[xColumn])
+    kind = axis_kind(df[xColumn])
+
+    fig = figure_template(theme, kind, figsize, dpi)
+    ax = fig.axes[0]
+    if kind == "text":
+        labels = df[xColumn].astype(str).to_numpy()
+        ax.xaxis.set_major_formatter(FuncFormatter(
+            lambda value, pos: labels[int(value)] if 0 <= value < len(labels) else ""
+        ))
+
+    # Decimate to the pixel width of the saved image, not of the screen
+    width = max(int(ax.get_position().width * figsize[0] * dpi), 100)
+    block = np.empty((len(df), len(columns)))
+    for i, column in enumerate(columns):
+        block[:, i] = df[column].to_numpy(dtype=float, na_value=np.nan)
+    # Each overlay of all the columns in one call
+    overlayBlocks = [apply_overlay_block(block, overlay, df[xColumn].to_numpy()) for overlay, _ in overlays]
+    for i, column in enumerate(columns):
+        plot_decimated(ax, xValues, block[:, i], width, label=column, color=colors.get(column),
+                       linewidth=1.8, alpha=0.9)
+        for (overlay, style), values in zip(overlays, overlayBlocks):
+            plot_decimated(ax, xValues, values[:, i], width, label=f"{column} ({overlay})", **style)
+
+    if columns:
+        ax.set_title(name, fontsize=13, fontweight="bold", pad=15)
+        loc = "best" if len(ax.lines) <= 10 else "upper left"
+        ax.legend(loc=loc, fontsize=9, framealpha=0.9, fancybox=True, shadow=True)
+    else:
+        ax.set_title("No numeric data selected")
+    ax.set_xlabel(xColumn, fontweight="600", fontsize=10)
+    ax.relim()
+    ax.autoscale_view()
+
+    fig.savefig(path, dpi=dpi)
+    return path
@@ -0,0 +1,223 @@
+"""Forecasts and rolling-origin backtests of exponential smoothing and AR models
+
+A series is split like the notebooks' seed(): the first `percentage` % of
+its rows train a model (smoothing parameters tuned by tuning.refine_search,
+AR coefficients by Yule-Walker), then `horizon`-step forecasts are made
+from origins spread between the end of the training rows and the end of
+the series. The model is filtered once over the series, keeping its state
+at every origin, so the forecasts of all folds come out of a single pass
+as one (folds, horizon) array and are scored together:
+
+    result = backtest(y, "HW-A", horizon=12, period=12)
+    result["mae"], result["rmse"], result["mape"]
+
+backtest_source compares every model on every numeric column of a
+dataset; the window runs one per dataset in a process pool
+(loader.ForecastBacktester).
+"""
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+from autocorrelation import acf, confidence_bound, durbin_levinson
+from datastore import Dataset
+from decomposition import detect_period
+from holtwinters import _initial_level, _initial_state, njit
+from tuning import MODELS as SMOOTHING_MODELS, refine_search
+
+MODELS = ("SES", "Holt", "HW-A", "HW-M", "AR")
+
+# Origins per backtest, at most, and the largest AR order considered
+MAX_FOLDS = 200
+MAX_AR_ORDER = 24
+
+# Horizon of series without a seasonal period
+DEFAULT_HORIZON = 10
+
+
+def split_point(rows, percentage=90):
+    """Number of training rows: the first `percentage` % of the series, as seed() splits it"""
+    return rows * int(percentage) // 100
+
+
+def rolling_origins(rows, start, horizon, folds=MAX_FOLDS):
+    """Up to `folds` evenly spaced forecast origins from start to the last one leaving `horizon` rows"""
+    last = rows - horizon
+    if last < start:
+        return np.empty(0, dtype=np.int64)
+    return np.unique(np.linspace(start, last, min(folds, last - start + 1)).round().astype(np.int64))
+
+
+@njit(cache=True)
+def _filter_states(y, alpha, beta, gamma, season, level, trend, useTrend, seasonal, start, origins,
+                   levels, trends, seasons):
+    # The holtwinters recurrence over y, keeping the state at each origin
+    # (before y[origin] is seen); seasonal: 0 none, 1 additive, 2 multiplicative
+    period = len(season)
+    fold = 0
+    for t in range(start, len(y)):
+        while fold < len(origins) and origins[fold] == t:
+            levels[fold] = level
+            trends[fold] = trend
+            seasons[fold, :] = season
+            fold += 1
+        if fold == len(origins):
+            break
+        value = y[t]
+        j = t % period
+        s = season[j]
+        if value == value:
+            if seasonal == 2:
+                newLevel = alpha * (value / s) + (1.0 - alpha) * (level + trend)
+                season[j] = gamma * (value / newLevel) + (1.0 - gamma) * s
+            else:
+                newLevel = alpha * (value - s) + (1.0 - alpha) * (level + trend)
+                if seasonal == 1:
+                    season[j] = gamma * (value - newLevel) + (1.0 - gamma) * s
+            if useTrend:
+                trend = beta * (newLevel - level) + (1.0 - beta) * trend
+            level = newLevel
+        else:
+            level = level + trend
+
+
+def smoothing_forecasts(y, model, params, origins, horizon, period=None, train=None):
+    """(folds, horizon) forecasts of an exponential smoothing model from each origin
+
+    The initial state comes from the first `train` rows (all of y by
+    default), the same way holtwinters initializes its fits.
+    """
+    useTrend, seasonal = SMOOTHING_MODELS[model]
+    y = np.ascontiguousarray(y, dtype=np.float64)
+    train = len(y) if train is None else train
+    if seasonal:
+        season, level, trend = _initial_state(y[:train], period, seasonal == 2)
+        start = 0
+    else:
+        start, level, trend = _initial_level(y[:train], useTrend)
+        season = np.zeros(1)
+    season = np.ascontiguousarray(season, dtype=np.float64)
+
+    folds = len(origins)
+    levels, trends = np.empty(folds), np.empty(folds)
+    seasons = np.empty((folds, len(season)))
+    _filter_states(y, float(params["alpha"]), float(params["beta"]), float(params["gamma"]), season,
+                   float(level), float(trend), useTrend, seasonal, start, np.asarray(origins, dtype=np.int64),
+                   levels, trends, seasons)
+
+    steps = np.arange(1, horizon + 1)
+    forecasts = levels[:, None] + steps * trends[:, None]
+    if seasonal:
+        # Step k from origin o is row o + k - 1, whose season slot is (o + k - 1) % period
+        slots = (np.asarray(origins)[:, None] + steps - 1) % len(season)
+        factors = np.take_along_axis(seasons, slots, axis=1)
+        forecasts = forecasts * factors if seasonal == 2 else forecasts + factors
+    return forecasts
+
+
+def fit_ar(y, maxOrder=MAX_AR_ORDER):
+    """Yule-Walker AR fit: {"order", "mean", "coefficients"}
+
+    The order is the last lag whose partial autocorrelation falls outside
+    the white-noise band (at least 1).
+    """
+    y = np.asarray(y, dtype=float)
+    finite = y[np.isfinite(y)]
+    maxOrder = min(maxOrder, len(finite) // 2)
+    if maxOrder < 1:
+        raise ValueError("AR needs at least two observed values")
+    r = acf(y, maxOrder)
+    partial = durbin_levinson(r)
+    significant = np.flatnonzero(np.abs(partial[1:]) > confidence_bound(len(finite)))
+    order = int(significant[-1]) + 1 if significant.size else 1
+    toeplitz = r[np.abs(np.subtract.outer(np.arange(order), np.arange(order)))]
+    coefficients = np.linalg.lstsq(toeplitz, r[1:order + 1], rcond=None)[0]
+    return {"order": order, "mean": float(finite.mean()), "coefficients": coefficients}
+
+
+def ar_forecasts(y, params, origins, horizon):
+    """(folds, horizon) forecasts of a fitted AR model from each origin, all folds stepped together"""
+    order, mean, coefficients = params["order"], params["mean"], params["coefficients"]
+    # Missing values count as the mean in the lags
+    centered = np.nan_to_num(np.asarray(y, dtype=float) - mean)
+    padded = np.r_[np.zeros(order), centered]
+    # Lags of each origin, most recent last: centered[origin - order:origin]
+    lags = sliding_window_view(padded, order)[np.asarray(origins)].copy()
+    forecasts = np.empty((len(origins), horizon))
+    for step in range(horizon):
+        forecasts[:, step] = lags @ coefficients[::-1]
+        lags = np.column_stack((lags[:, 1:], forecasts[:, step]))
+    return forecasts + mean
+
+
+def scores(actual, forecasts):
+    """MAE, RMSE and MAPE (%) over every fold and step at once; MAPE leaves out zero actuals"""
+    errors = actual - forecasts
+    with np.errstate(invalid="ignore", divide="ignore"):
+        absolute = np.abs(errors)
+        percent = np.where(actual != 0, absolute / np.abs(actual), np.nan)
+        return {
+            "mae": float(np.nanmean(absolute)),
+            "rmse": float(np.sqrt(np.nanmean(errors * errors))),
+            "mape": float(100 * np.nanmean(percent)) if np.isfinite(percent).any() else np.nan,
+        }
+
+
+def backtest(y, model, horizon, period=None, percentage=90, folds=MAX_FOLDS):
+    """Rolling-origin backtest of one model on a series
+
+    Returns {"model", "params", "folds", "horizon", "mae", "rmse", "mape"};
+    raises ValueError when the model does not apply (e.g. no period for
+    Holt-Winters, non-positive data for HW-M, too few rows).
+    """
+    y = np.ascontiguousarray(y, dtype=np.float64)
+    train = split_point(len(y), percentage)
+    if train < 2:
+        raise ValueError("too few training rows")
+    origins = rolling_origins(len(y), train, horizon, folds)
+    if not len(origins):
+        raise ValueError(f"no room for a {horizon}-step forecast after {train} training rows")
+
+    if model == "AR":
+        params = fit_ar(y[:train])
+        forecasts = ar_forecasts(y, params, origins, horizon)
+        shown = {"order": params["order"]}
+    else:
+        if SMOOTHING_MODELS[model][1]:
+            if not period:
+                raise ValueError(f"{model} needs a seasonal period: none was detected")
+            if train < 2 * period:
+                raise ValueError(f"{model} needs two seasons of training rows")
+        params = refine_search(y[:train], model, period)
+        forecasts = smoothing_forecasts(y, model, params, origins, horizon, period, train)
+        shown = {name: round(params[name], 4) for name in ("alpha", "beta", "gamma") if params[name]}
+
+    # Row origin + k of y is the actual value of step k + 1 from that origin
+    actual = y[origins[:, None] + np.arange(horizon)]
+    return {"model": model, "params": shown, "folds": len(origins), "horizon": horizon,
+            **scores(actual, forecasts)}
+
+
+def backtest_source(source, models=MODELS, horizon=None, percentage=90, folds=MAX_FOLDS):
+    """Backtests of every model on every numeric column of a dataset (DataFrame, cache entry or Dataset)
+
+    The period is detected once for the dataset (decomposition.detect_period)
+    and the horizon defaults to it. Returns a list of rows: the backtest
+    results plus "column", or "column", "model" and "error" for models that
+    do not apply.
+    """
+    dataset = source if isinstance(source, Dataset) else Dataset(source, downcast=False)
+    columns = [column for column in dataset.columns[1:] if dataset.isNumeric(column)]
+    if not columns or len(dataset) < 4:
+        return []
+    block = dataset.block(columns)
+    period = detect_period(block[:split_point(len(block), percentage)], dataset[dataset.columns[0]].to_numpy())
+    horizon = int(horizon or period or DEFAULT_HORIZON)
+
+    rows = []
+    for i, column in enumerate(columns):
+        for model in models:
+            try:
+                rows.append({"column": column, **backtest(block[:, i], model, horizon, period, percentage, folds)})
+            except (ValueError, np.linalg.LinAlgError) as e:
+                rows.append({"column": column, "model": model, "error": str(e)})
+    return rows
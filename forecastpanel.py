@@ -0,0 +1,127 @@
+"""Dock comparing forecasting models by rolling-origin backtests"""
+from PyQt6.QtCore import Qt, pyqtSignal
+from PyQt6.QtGui import QFont
+from PyQt6.QtWidgets import (
+    QAbstractItemView, QComboBox, QDockWidget, QHBoxLayout, QHeaderView, QLabel, QPushButton,
+    QTableWidget, QTableWidgetItem, QVBoxLayout, QWidget
+)
+
+from summarypanel import format_value
+
+
+class ForecastPanel(QDockWidget):
+    """One row per dataset, column and model: parameters, folds, MAE, RMSE and MAPE
+
+    The panel only collects settings and shows results; the window runs
+    the backtests (forecasting.backtest_source) in the background when
+    backtestRequested is emitted, with True to backtest every dataset.
+    The model with the lowest RMSE on each column is shown in bold.
+    """
+    backtestRequested = pyqtSignal(bool)
+
+    HEADERS = ("Dataset", "Column", "Model", "Parameters", "Horizon", "Folds", "MAE", "RMSE", "MAPE %")
+
+    def __init__(self, parent=None):
+        super().__init__("Forecast Backtests", parent)
+        self.setObjectName("forecastPanel")
+        # name -> backtest_source rows, or None while they are computed
+        self.results = {}
+
+        widget = QWidget()
+        layout = QVBoxLayout(widget)
+        controls = QHBoxLayout()
+        controls.addWidget(QLabel("Horizon:"))
+        self.horizonCombo = QComboBox()
+        self.horizonCombo.addItems(["Auto", "1", "6", "12", "24", "48"])
+        self.horizonCombo.setToolTip("Steps forecast from each origin; Auto uses the detected seasonal period")
+        controls.addWidget(self.horizonCombo)
+        controls.addWidget(QLabel("Training:"))
+        self.trainingCombo = QComboBox()
+        self.trainingCombo.addItems(["90 %", "80 %", "70 %", "50 %"])
+        self.trainingCombo.setToolTip("Share of each series the models are fitted on; the rest is forecast")
+        controls.addWidget(self.trainingCombo)
+        currentButton = QPushButton("Current Dataset")
+        currentButton.clicked.connect(lambda: self.backtestRequested.emit(False))
+        allButton = QPushButton("All Datasets")
+        allButton.clicked.connect(lambda: self.backtestRequested.emit(True))
+        controls.addWidget(currentButton)
+        controls.addWidget(allButton)
+        controls.addStretch()
+
+        self.infoLabel = QLabel("Backtest the current dataset or all of them to compare the models.")
+        self.infoLabel.setWordWrap(True)
+        self.table = QTableWidget()
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        self.table.verticalHeader().setVisible(False)
+        layout.addLayout(controls)
+        layout.addWidget(self.infoLabel)
+        layout.addWidget(self.table)
+        self.setWidget(widget)
+
+    def settings(self):
+        """Keyword arguments of forecasting.backtest_source chosen in the panel"""
+        horizon = self.horizonCombo.currentText()
+        return {
+            "horizon": None if horizon == "Auto" else int(horizon),
+            "percentage": int(self.trainingCombo.currentText().split()[0]),
+        }
+
+    def setPending(self, names):
+        """Show names as being backtested, replacing all previous results"""
+        self.results = dict.fromkeys(names)
+        self.showResults()
+
+    def setResult(self, name, rows):
+        """Store and show the backtest_source rows of name"""
+        self.results[name] = rows
+        self.showResults()
+
+    def setFailed(self, name, message):
+        self.results.pop(name, None)
+        self.showResults()
+        self.infoLabel.setText(f"Could not backtest {name}: {message}")
+
+    def setProgress(self, done, total):
+        if done == total:
+            self.infoLabel.setText(f"Backtested {total} dataset(s); the lowest RMSE of each column is in bold.")
+        elif total:
+            self.infoLabel.setText(f"Backtested {done} of {total} dataset(s)...")
+
+    def clear(self):
+        self.results.clear()
+        self.showResults()
+        self.infoLabel.setText("Backtest the current dataset or all of them to compare the models.")
+
+    def showResults(self):
+        """Fill the table with the results of every finished dataset"""
+        rows = [(name, row) for name, result in self.results.items() if result for row in result]
+        # Best model of each column, by RMSE
+        best = {}
+        for name, row in rows:
+            if "error" not in row and row["rmse"] == row["rmse"]:
+                key = (name, row["column"])
+                if key not in best or row["rmse"] < best[key]["rmse"]:
+                    best[key] = row
+
+        self.table.clear()
+        self.table.setRowCount(len(rows))
+        self.table.setColumnCount(len(self.HEADERS))
+        self.table.setHorizontalHeaderLabels(self.HEADERS)
+        bold = QFont()
+        bold.setBold(True)
+        for i, (name, row) in enumerate(rows):
+            if "error" in row:
+                cells = [name, str(row["column"]), row["model"], row["error"], "", "", "", "", ""]
+            else:
+                params = ", ".join(f"{key}={value}" for key, value in row["params"].items())
+                cells = [name, str(row["column"]), row["model"], params, str(row["horizon"]), str(row["folds"])]
+                cells += ["" if row[field] != row[field] else format_value(row[field])
+                          for field in ("mae", "rmse", "mape")]
+            for col, text in enumerate(cells):
+                item = QTableWidgetItem(text)
+                if col >= 4:
+                    item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                if best.get((name, row["column"])) is row:
+                    item.setFont(bold)
+                self.table.setItem(i, col, item)
@@ -0,0 +1,191 @@
+"""Holt-Winters exponential smoothing family
+
+Each model returns the one-step-ahead fitted values: entry t is the
+forecast of y[t] made from y[:t]. The recurrences run in compiled loops
+when numba is installed; otherwise the same loops run on plain Python
+floats, which is still far cheaper than indexing pandas objects per
+element. Missing values are skipped: the state is carried forward by its
+own forecast. SES and Holt start from the first observed value, and
+their fitted values before it are missing.
+"""
+import numpy as np
+import pandas as pd
+
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:
+    HAVE_NUMBA = False
+
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        return lambda function: function
+
+
+@njit(cache=True)
+def _ses(y, alpha, level, start, out):
+    for t in range(start - 1):
+        out[t] = np.nan
+    if start > 0:
+        out[start - 1] = level
+    for t in range(start, len(y)):
+        out[t] = level
+        if y[t] == y[t]:
+            level = alpha * y[t] + (1.0 - alpha) * level
+    return out
+
+
+@njit(cache=True)
+def _holt(y, alpha, beta, level, trend, start, out):
+    for t in range(start - 1):
+        out[t] = np.nan
+    if start > 0:
+        out[start - 1] = level
+    for t in range(start, len(y)):
+        forecast = level + trend
+        out[t] = forecast
+        if y[t] == y[t]:
+            previous = level
+            level = alpha * y[t] + (1.0 - alpha) * forecast
+            trend = beta * (level - previous) + (1.0 - beta) * trend
+        else:
+            level = forecast
+    return out
+
+
+@njit(cache=True)
+def _holt_winters(y, alpha, beta, gamma, season, level, trend, multiplicative, out):
+    period = len(season)
+    for t in range(len(y)):
+        s = season[t % period]
+        if multiplicative:
+            forecast = (level + trend) * s
+        else:
+            forecast = level + trend + s
+        out[t] = forecast
+
+        if y[t] == y[t]:
+            previous = level
+            if multiplicative:
+                level = alpha * (y[t] / s) + (1.0 - alpha) * (level + trend)
+                season[t % period] = gamma * (y[t] / level) + (1.0 - gamma) * s
+            else:
+                level = alpha * (y[t] - s) + (1.0 - alpha) * (level + trend)
+                season[t % period] = gamma * (y[t] - level) + (1.0 - gamma) * s
+            trend = beta * (level - previous) + (1.0 - beta) * trend
+        else:
+            level = level + trend
+    return out
+
+
+def _prepare(y):
+    """Return (kernel input, output buffer) in the form the kernels run fastest on"""
+    y = np.ascontiguousarray(y, dtype=np.float64)
+    if HAVE_NUMBA:
+        return y, np.empty_like(y)
+    return y.tolist(), [0.0] * len(y)
+
+
+def _initial_level(y, useTrend=True):
+    """(start, level, trend) of SES and Holt, seeded from the first observed values of y
+
+    The level is the first observed value and the trend the slope to the
+    next one; start is the row after the first observed value, the one the
+    recurrence starts at (len(y) when nothing is observed).
+    """
+    observed = np.flatnonzero(~np.isnan(y))
+    if not observed.size:
+        return len(y), np.nan, 0.0
+    first = observed[0]
+    trend = 0.0
+    if useTrend and observed.size > 1:
+        trend = (y[observed[1]] - y[first]) / (observed[1] - first)
+    return int(first) + 1, float(y[first]), float(trend)
+
+
+def _initial_state(y, period, multiplicative):
+    """Classical initial level, trend and seasonal indices from the first two seasons"""
+    first = np.nanmean(y[:period])
+    second = np.nanmean(y[period:2 * period])
+    trend = (second - first) / period
+    if multiplicative:
+        season = y[:period] / first
+    else:
+        season = y[:period] - first
+    season = np.where(np.isnan(season), 1.0 if multiplicative else 0.0, season)
+    # Level just before the first observation, so the loop starts at t = 0
+    return season, first - trend * (period + 1) / 2, trend
+
+
+def simple_exponential_smoothing(y, alpha):
+    """One-step-ahead fitted values of simple exponential smoothing"""
+    values = np.ascontiguousarray(y, dtype=np.float64)
+    if len(values) == 0:
+        return np.empty(0)
+    start, level, _ = _initial_level(values, useTrend=False)
+    y, out = _prepare(values)
+    return np.asarray(_ses(y, float(alpha), level, start, out))
+
+
+def double_exponential_smoothing(y, alpha, beta):
+    """One-step-ahead fitted values of Holt's linear trend method"""
+    values = np.ascontiguousarray(y, dtype=np.float64)
+    if len(values) < 2:
+        return values.copy()
+    start, level, trend = _initial_level(values)
+    y, out = _prepare(values)
+    return np.asarray(_holt(y, float(alpha), float(beta), level, trend, start, out))
+
+
+def holt_winters(y, alpha, beta, gamma, period, multiplicative=False):
+    """One-step-ahead fitted values of Holt-Winters with seasonality of `period`"""
+    values = np.ascontiguousarray(y, dtype=np.float64)
+    if period < 2 or len(values) < 2 * period:
+        raise ValueError(f"Holt-Winters needs at least two seasons ({2 * period} rows)")
+    if multiplicative and np.nanmin(values) <= 0:
+        raise ValueError("Multiplicative seasonality needs strictly positive data")
+
+    season, level, trend = _initial_state(values, period, multiplicative)
+    y, out = _prepare(values)
+    if not HAVE_NUMBA:
+        season = season.tolist()
+    return np.asarray(_holt_winters(
+        y, float(alpha), float(beta), float(gamma), season, level, trend, multiplicative, out
+    ))
+
+
+def holt_winters_additive(y, alpha, beta, gamma, period):
+    """Holt-Winters with additive seasonality"""
+    return holt_winters(y, alpha, beta, gamma, period, multiplicative=False)
+
+
+def holt_winters_multiplicative(y, alpha, beta, gamma, period):
+    """Holt-Winters with multiplicative seasonality"""
+    return holt_winters(y, alpha, beta, gamma, period, multiplicative=True)
+
+
+def infer_period(index):
+    """Guess the seasonal period from the spacing of a datetime index
+
+    Returns None when the index is not datetime-like or has no usual cycle.
+    """
+    if not isinstance(index, pd.DatetimeIndex) or len(index) < 3:
+        return None
+
+    step = pd.Series(index).diff().median()
+    if pd.isna(step) or step <= pd.Timedelta(0):
+        return None
+
+    days = step / pd.Timedelta(days=1)
+    if days < 1:
+        return int(round(1 / days))   # intraday samples: daily cycle
+    if days < 2:
+        return 7                      # daily: weekly cycle
+    if days < 10:
+        return 52                     # weekly: yearly cycle
+    if days < 45:
+        return 12                     # monthly: yearly cycle
+    if days < 135:
+        return 4                      # quarterly: yearly cycle
+    return None
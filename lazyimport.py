@@ -0,0 +1,52 @@
+"""Deferred imports, so the window can appear before the scientific stack is loaded
+
+numpy, pandas and matplotlib take most of the cold start. Modules that
+only need them inside functions bind them with LazyModule, which imports
+on first attribute access, and the GUI warms them up with `preload` in a
+background thread once the window is on screen.
+"""
+import importlib
+import threading
+
+
+class LazyModule:
+    """Stand-in for a module that imports it when an attribute is first read
+
+    `pd = LazyModule("pandas")` costs nothing at import time; the first
+    `pd.DataFrame` imports pandas and caches the attribute, so later reads
+    are plain instance attribute lookups.
+    """
+    def __init__(self, name):
+        self.__dict__["_name"] = name
+
+    def __getattr__(self, attribute):
+        value = getattr(importlib.import_module(self._name), attribute)
+        self.__dict__[attribute] = value
+        return value
+
+    def __repr__(self):
+        return f"<lazy module {self._name!r}>"
+
+
+def preload(names, done=None):
+    """Import modules in order in a daemon thread, then call done(error) from that thread
+
+    error is None when every module imported, otherwise the exception that
+    stopped the preload (a missing or broken dependency), so the caller is
+    always told how it ended. A module the main thread asks for while it is
+    being imported here is simply waited for (the import lock is per
+    module), so preloading never imports anything twice.
+    """
+    def run():
+        error = None
+        try:
+            for name in names:
+                importlib.import_module(name)
+        except Exception as e:
+            error = e
+        if done is not None:
+            done(error)
+
+    thread = threading.Thread(target=run, name="preload", daemon=True)
+    thread.start()
+    return thread
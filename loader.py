@@ -0,0 +1,228 @@
+"""Background CSV ingestion, figure export, summaries and backtests for the main window"""
+import multiprocessing
+import os
+import time
+from concurrent.futures import CancelledError, ProcessPoolExecutor
+from functools import partial
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+from lazyimport import LazyModule
+from profiling import profiler
+
+# Only the workers need these at once; the window imports them after it is shown
+chunkstats = LazyModule("chunkstats")
+datasetcache = LazyModule("datasetcache")
+figures = LazyModule("figures")
+forecasting = LazyModule("forecasting")
+
+
+class BackgroundPool(QObject):
+    """Run a batch of jobs in a process pool and report each one as it finishes
+
+    Signals are always delivered on the thread owning the object, so slots
+    connected from the GUI can touch widgets directly. Subclasses submit
+    jobs with _start; each finished job is passed to onResult(key, result)
+    or onError(key, message), given to the constructor; subclasses pass
+    lambdas emitting their signals, which cannot be read before
+    QObject.__init__ has run.
+    """
+    progress = pyqtSignal(int, int)
+    finished = pyqtSignal()
+
+    _futureDone = pyqtSignal(int, str, object)
+
+    def __init__(self, onResult, onError, parent=None, maxWorkers=None):
+        super().__init__(parent)
+        self._onResult = onResult
+        self._onError = onError
+        self.maxWorkers = maxWorkers or os.cpu_count() or 1
+        self._executor = None
+        self._futures = []
+        self._generation = 0
+        self._total = 0
+        self._done = 0
+        self._submitted = {}
+        self._futureDone.connect(self._onFutureDone)
+
+    def isRunning(self):
+        """Return True while a batch is in progress"""
+        return self._done < self._total
+
+    def _start(self, jobs):
+        """Submit (key, function, args) jobs, cancelling any batch still in flight"""
+        if self.isRunning():
+            self.cancel()
+
+        jobs = list(jobs)
+        if not jobs:
+            return
+
+        if self._executor is None:
+            # Spawn rather than fork: forking a process that runs Qt threads is unsafe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.maxWorkers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+
+        self._generation += 1
+        self._total = len(jobs)
+        self._done = 0
+        self.progress.emit(0, self._total)
+
+        generation = self._generation
+        self._futures = []
+        self._submitted = {}
+        for key, function, args in jobs:
+            self._submitted[key] = time.perf_counter()
+            future = self._executor.submit(function, *args)
+            future.add_done_callback(
+                lambda f, key=key: self._futureDone.emit(generation, key, f)
+            )
+            self._futures.append(future)
+
+    def cancel(self):
+        """Drop pending jobs; results of jobs already running are ignored"""
+        if not self.isRunning():
+            return
+
+        for future in self._futures:
+            future.cancel()
+        self._futures = []
+        self._generation += 1
+        self._total = self._done = 0
+        self.finished.emit()
+
+    def shutdown(self):
+        """Cancel outstanding work and stop the worker processes"""
+        self.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _onFutureDone(self, generation, key, future):
+        if generation != self._generation:
+            return
+
+        try:
+            result = future.result()
+        except CancelledError:
+            return
+        except Exception as e:
+            self._onError(key, str(e))
+        else:
+            self._onResult(key, result)
+
+        self._done += 1
+        self.progress.emit(self._done, self._total)
+        if self._done == self._total:
+            self._futures = []
+            self.finished.emit()
+
+
+class DatasetLoader(BackgroundPool):
+    """Parse CSV files in a process pool and report each one as it finishes
+
+    Workers parse each file into the on-disk dataset cache (or find it
+    already there) and datasetLoaded carries the cache entry, whose columns
+    are memory-mapped on demand, so parsed data never has to be pickled back
+    from the worker. When the cache cannot be written it carries the
+    DataFrame instead.
+    """
+    datasetLoaded = pyqtSignal(str, object)
+    loadFailed = pyqtSignal(str, str)
+
+    def __init__(self, parent=None, maxWorkers=None, cache=None):
+        super().__init__(self._onLoaded, lambda path, message: self.loadFailed.emit(path, message),
+                         parent, maxWorkers)
+        self._cache = cache
+
+    @property
+    def cache(self):
+        """The DatasetCache files are parsed into, opened on first use"""
+        if self._cache is None:
+            self._cache = datasetcache.DatasetCache()
+        return self._cache
+
+    def load(self, files):
+        """Start parsing files, cancelling any batch still in flight"""
+        self._start((file, datasetcache.cache_dataset, (file, self.cache.root)) for file in files)
+
+    def _onLoaded(self, path, result):
+        if path in self._submitted:
+            # Includes waiting for a free worker when there are more files than workers
+            profiler.record("parse (worker)", time.perf_counter() - self._submitted[path])
+        try:
+            df = self.cache.entry(result) if isinstance(result, str) else result
+        except (OSError, ValueError) as e:
+            self.loadFailed.emit(path, str(e))
+        else:
+            self.datasetLoaded.emit(path, df)
+
+
+class DatasetExporter(BackgroundPool):
+    """Render datasets to image files in a process pool
+
+    Each job holds the keyword arguments of figures.render_dataset; datasets
+    coming from the cache are sent as their cache entry and memory-mapped
+    again by the worker rather than pickled.
+    """
+    exported = pyqtSignal(str, str)
+    exportFailed = pyqtSignal(str, str)
+
+    def __init__(self, parent=None, maxWorkers=None):
+        super().__init__(lambda name, path: self.exported.emit(name, path),
+                         lambda name, message: self.exportFailed.emit(name, message), parent, maxWorkers)
+
+    def export(self, jobs):
+        """Start rendering {name: render_dataset kwargs}, cancelling any export in flight"""
+        self._start((name, partial(figures.render_dataset, **kwargs), ()) for name, kwargs in jobs.items())
+
+
+class DatasetSummarizer(BackgroundPool):
+    """Compute chunkstats summaries in a process pool
+
+    Loaded datasets are sent as their cache entry (or DataFrame) and read
+    back in chunks through the memory map; CSV files are summarized
+    straight from disk, so they never have to fit in memory.
+    """
+    summarized = pyqtSignal(str, object)
+    summaryFailed = pyqtSignal(str, str)
+
+    def __init__(self, parent=None, maxWorkers=None):
+        super().__init__(lambda name, summary: self.summarized.emit(name, summary),
+                         lambda name, message: self.summaryFailed.emit(name, message), parent, maxWorkers)
+
+    def summarizeDatasets(self, sources, lags=(1,)):
+        """Start summarizing {name: cache entry or DataFrame}, cancelling any batch in flight"""
+        self._start((name, partial(chunkstats.summarize_source, source, lags), ())
+                    for name, source in sources.items())
+
+    def summarizeFiles(self, files, lags=(1,)):
+        """Start summarizing {name: CSV path} without loading the files"""
+        self._start((name, partial(chunkstats.summarize_csv, path, lags), ())
+                    for name, path in files.items())
+
+
+class ForecastBacktester(BackgroundPool):
+    """Run forecasting backtests in a process pool, one job per dataset
+
+    Each worker compares every model on every numeric column of its
+    dataset (forecasting.backtest_source); the folds of each backtest are
+    computed together inside the job, so the pool only spreads datasets
+    over the cores.
+    """
+    backtested = pyqtSignal(str, object)
+    backtestFailed = pyqtSignal(str, str)
+
+    def __init__(self, parent=None, maxWorkers=None):
+        super().__init__(lambda name, rows: self.backtested.emit(name, rows),
+                         lambda name, message: self.backtestFailed.emit(name, message), parent, maxWorkers)
+
+    def backtestDatasets(self, sources, **settings):
+        """Start backtesting {name: cache entry or DataFrame}, cancelling any batch in flight
+
+        settings are keyword arguments of forecasting.backtest_source.
+        """
+        self._start((name, partial(forecasting.backtest_source, source, **settings), ())
+                    for name, source in sources.items())
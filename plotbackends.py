@@ -0,0 +1,245 @@
+"""Interchangeable time series plots behind one plotting interface
+
+MainWindow draws the series through a backend and never touches its
+artists, so the plot can be switched at run time (View > Plot Backend):
+
+    matplotlib  MatplotlibPlot, the FigureCanvasQTAgg plot: lines are
+                blitted over a cached background, but pan and zoom redraw
+                the whole figure through Agg
+    raster      rasterplot.RasterPlot, painted with QPainter: pan and zoom
+                only map the decimated points to pixels, which keeps them
+                smooth over 10^7-row datasets without OpenGL
+
+A backend is created with (parent window, xlimChanged) and provides:
+
+    widget                               the page shown in the plot stack
+    hasDataset(name), addDataset(name, xlabel, kind, labels=None), removeDataset(name)
+    showDataset(name) -> True when the shown dataset changed
+    isShown(name)
+    hasLine(key), addLine(key, x, y, **style), setLineData(key, x, y)
+    lineVisible(key), setLineVisible(key, visible)
+    refresh(datasetName, switched=False), setTitle(title)
+    plotWidth(), exportWidth(dpi), viewXlim(), markDecimated()
+    setTheme(theme), draw(), redraw(), clear(), savefig(path, **kwargs)
+
+Lines are keyed by (dataset, column, overlay) and belong to the dataset
+of their key; kind is figures.axis_kind of the x column, and style takes
+matplotlib line keyword arguments. xlimChanged is called after a zoom or
+pan; the window then re-decimates the visible lines for viewXlim().
+Exports always go through matplotlib, so they look the same whichever
+backend is on screen; before savefig the window re-decimates the lines
+to exportWidth(dpi), the pixel width of the axes in the saved image.
+"""
+from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg, NavigationToolbar2QT
+from matplotlib.figure import Figure
+from matplotlib.ticker import FuncFormatter
+from PyQt6.QtWidgets import QVBoxLayout, QWidget
+
+import figures
+from blitting import BlitManager
+from profiling import profiler
+from rasterplot import RasterPlot
+
+
+class MatplotlibPlot:
+    """The time series plot drawn by matplotlib, one axes per dataset
+
+    Each dataset gets its own axes, created on first display and then
+    only shown or hidden. Its lines are animated and redrawn by blitting
+    over the static background.
+    """
+    def __init__(self, parent, xlimChanged):
+        self.xlimChanged = xlimChanged
+        self.theme = "light"
+        self.canvas = FigureCanvasQTAgg(Figure(figsize=(8, 6)))
+        self.ax = self.canvas.figure.subplots()
+        self.ax.set_title("Load a dataset to begin")
+        self.placeholderAxes = self.ax
+        self.toolbar = NavigationToolbar2QT(self.canvas, parent)
+        self.blitManager = BlitManager(self.canvas, self.animatedArtists)
+
+        self.widget = QWidget()
+        layout = QVBoxLayout(self.widget)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.toolbar)
+        layout.addWidget(self.canvas)
+
+        self.datasetAxes = {}
+        self.lines = {}
+        self.decimatedXlim = {}
+
+    def hasDataset(self, name):
+        return name in self.datasetAxes
+
+    def addDataset(self, name, xlabel, kind, labels=None):
+        """Create the (hidden) axes of a dataset"""
+        ax = self.canvas.figure.add_subplot(111)
+        ax.set_visible(False)
+        ax.callbacks.connect('xlim_changed', self.onXlimChanged)
+        if xlabel is not None:
+            ax.set_xlabel(xlabel, fontweight='600', fontsize=10)
+        if kind == "datetime":
+            ax.tick_params(axis='x', labelrotation=30)
+        elif kind == "text":
+            # Text labels: plotted against row positions, shown as tick labels
+            ax.xaxis.set_major_formatter(FuncFormatter(
+                lambda value, pos: labels[int(value)] if 0 <= value < len(labels) else ""
+            ))
+        self.datasetAxes[name] = ax
+
+    def removeDataset(self, name):
+        """Remove the axes of a dataset and its lines"""
+        ax = self.datasetAxes.pop(name)
+        for key in [key for key in self.lines if key[0] == name]:
+            del self.lines[key]
+        self.decimatedXlim.pop(ax, None)
+        ax.remove()
+        if ax is self.ax:
+            self.ax = self.placeholderAxes
+            self.ax.set_visible(True)
+            figures.style_axes(self.ax, self.theme)
+
+    def showDataset(self, name):
+        """Make the axes of a dataset current; True when the displayed axes changed"""
+        previous = self.ax
+        self.ax = self.datasetAxes[name]
+        if self.ax is previous and self.ax.get_visible():
+            return False
+
+        previous.set_visible(False)
+        self.ax.set_visible(True)
+        figures.style_axes(self.ax, self.theme)
+        self.toolbar.update()
+        return True
+
+    def isShown(self, name):
+        return self.datasetAxes.get(name) is self.ax
+
+    def hasLine(self, key):
+        return key in self.lines
+
+    def addLine(self, key, x, y, **style):
+        line, = self.datasetAxes[key[0]].plot(x, y, animated=True, **style)
+        self.lines[key] = line
+
+    def setLineData(self, key, x, y):
+        self.lines[key].set_data(x, y)
+
+    def lineVisible(self, key):
+        return self.lines[key].get_visible()
+
+    def setLineVisible(self, key, visible):
+        self.lines[key].set_visible(visible)
+
+    def refresh(self, datasetName, switched=False):
+        """Redraw after lines were shown or hidden
+
+        Only the lines and legend are blitted unless the title or the
+        autoscaled limits changed, which needs a full canvas draw.
+        """
+        lines = [line for line in self.ax.get_lines() if line.get_visible()]
+
+        title = datasetName if lines else "No numeric data selected"
+        staticChanged = switched or title != self.ax.get_title()
+        if staticChanged:
+            if lines:
+                self.ax.set_title(datasetName, fontsize=13, fontweight='bold', pad=15)
+            else:
+                self.ax.set_title("No numeric data selected")
+
+        with profiler.stage("legend"):
+            legend = self.ax.get_legend()
+            if legend is not None:
+                legend.remove()
+            if lines:
+                # 'best' placement is searched on every draw, which dominates blits of wide datasets
+                loc = 'best' if len(lines) <= 10 else 'upper left'
+                legend = self.ax.legend(handles=lines, loc=loc, fontsize=9, framealpha=0.9,
+                                        fancybox=True, shadow=True)
+                legend.set_animated(True)
+                legend.set_in_layout(False)
+
+        with profiler.stage("autoscale"):
+            limits = (self.ax.get_xlim(), self.ax.get_ylim())
+            self.ax.relim(visible_only=True)
+            self.ax.autoscale_view()
+
+        if staticChanged or limits != (self.ax.get_xlim(), self.ax.get_ylim()):
+            if switched:
+                with profiler.stage("layout"):
+                    self.canvas.figure.tight_layout()
+            with profiler.stage("draw"):
+                self.canvas.draw()
+        else:
+            with profiler.stage("blit"):
+                self.blitManager.update()
+
+    def setTitle(self, title):
+        self.ax.set_title(title)
+        self.canvas.draw()
+
+    def animatedArtists(self):
+        """Artists redrawn by blitting: the visible lines and legend of the current axes"""
+        artists = [line for line in self.ax.get_lines() if line.get_visible()]
+        legend = self.ax.get_legend()
+        if legend is not None:
+            artists.append(legend)
+        return artists
+
+    def plotWidth(self):
+        """Width of the axes in pixels, i.e. the number of decimation buckets"""
+        return max(int(self.ax.bbox.width), 100)
+
+    def exportWidth(self, dpi):
+        """Width of the axes in pixels when the figure is saved at dpi"""
+        return max(int(self.ax.bbox.width * dpi / self.canvas.figure.dpi), 100)
+
+    def viewXlim(self):
+        """Visible x range when zoomed in, None while the axes autoscale"""
+        return None if self.ax.get_autoscalex_on() else self.ax.get_xlim()
+
+    def markDecimated(self):
+        """Visible x range, noted as the one the lines are now decimated for"""
+        xlim = self.ax.get_xlim()
+        self.decimatedXlim[self.ax] = xlim
+        return xlim
+
+    def onXlimChanged(self, ax):
+        # Autoscaling re-emits xlim_changed with unchanged limits on every refresh
+        if ax is self.ax and ax.get_xlim() != self.decimatedXlim.get(ax):
+            self.xlimChanged()
+
+    def setTheme(self, theme):
+        self.theme = theme
+        figures.style_axes(self.ax, theme)
+        self.canvas.figure.patch.set_facecolor(figures.THEMES[theme]["figure"])
+
+    def draw(self):
+        self.canvas.draw()
+
+    def redraw(self):
+        """Draw once control returns to the event loop"""
+        self.canvas.draw_idle()
+
+    def clear(self):
+        """Remove every dataset and line, back to the placeholder axes"""
+        for ax in self.datasetAxes.values():
+            ax.remove()
+        self.datasetAxes.clear()
+        self.lines.clear()
+        self.decimatedXlim.clear()
+        self.ax = self.placeholderAxes
+        self.ax.set_visible(True)
+        figures.style_axes(self.ax, self.theme)
+
+    def savefig(self, path, **kwargs):
+        """Figure.savefig of the canvas, blitted artists included"""
+        with self.blitManager.staticArtists():
+            self.canvas.figure.savefig(path, **kwargs)
+
+
+# View > Plot Backend entries and STATVIZ_PLOT_BACKEND values
+BACKENDS = {
+    "matplotlib": MatplotlibPlot,
+    "raster": RasterPlot,
+}
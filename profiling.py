@@ -0,0 +1,206 @@
+"""Optional timing of the load and redraw hot paths
+
+Off unless the app is started with --profile or STATVIZ_PROFILE=1. Methods
+decorated with `profiler.frame(name)` are timed as a whole and the
+`profiler.stage(name)` blocks inside them (parsing, transforms,
+decimation, plotting, layout, drawing) separately; the last frames are
+shown in a ProfilerPanel and, when recording is on, their cProfile data
+can be saved for snakeviz, pstats or `python -m pstats`.
+"""
+import cProfile
+import ctypes
+import functools
+import inspect
+import os
+import pstats
+import sys
+import time
+from collections import deque
+from contextlib import contextmanager, nullcontext
+
+from PyQt6.QtCore import QObject, Qt, pyqtSignal
+from PyQt6.QtGui import QFont
+from PyQt6.QtWidgets import (
+    QCheckBox, QDockWidget, QFileDialog, QHBoxLayout, QLabel, QPushButton, QVBoxLayout, QWidget
+)
+
+_NULL_STAGE = nullcontext()
+
+
+def resident_bytes():
+    """Resident set size of this process, or None where it cannot be read"""
+    if sys.platform == "win32":
+        class Counters(ctypes.Structure):
+            _fields_ = [(name, ctypes.c_size_t) for name in (
+                "cb", "PageFaultCount", "PeakWorkingSetSize", "WorkingSetSize",
+                "QuotaPeakPagedPoolUsage", "QuotaPagedPoolUsage", "QuotaPeakNonPagedPoolUsage",
+                "QuotaNonPagedPoolUsage", "PagefileUsage", "PeakPagefileUsage")]
+        counters = Counters()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return counters.WorkingSetSize
+        return None
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class Profiler(QObject):
+    """Per-stage wall times of the last `keep` frames
+
+    A frame is one top-level call of a decorated method; frames entered
+    while another is running count towards the outer one. Stage times of a
+    frame are summed per name. Everything is a no-op while disabled.
+    """
+    frameDone = pyqtSignal(dict)
+
+    def __init__(self, enabled=False, keep=20):
+        super().__init__()
+        self.enabled = enabled
+        self.recording = False
+        self.frames = deque(maxlen=keep)
+        self.profiles = deque(maxlen=keep)
+        self._stages = None
+
+    def frame(self, name):
+        """Decorator timing each top-level call of a method as one frame"""
+        def decorate(function):
+            code = function.__code__
+            # Qt passes signal arguments a slot does not take only to
+            # slots that accept them, which a *args wrapper always does
+            maxArgs = None if code.co_flags & inspect.CO_VARARGS else code.co_argcount
+
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                args = args[:maxArgs]
+                if not self.enabled or self._stages is not None:
+                    return function(*args, **kwargs)
+                return self._runFrame(name, function, args, kwargs)
+            return wrapper
+        return decorate
+
+    def _runFrame(self, name, function, args, kwargs):
+        self._stages = {}
+        profile = cProfile.Profile() if self.recording else None
+        start = time.perf_counter()
+        try:
+            if profile is None:
+                return function(*args, **kwargs)
+            return profile.runcall(function, *args, **kwargs)
+        finally:
+            total = time.perf_counter() - start
+            stages, self._stages = self._stages, None
+            record = {"name": name, "total": total, "stages": stages, "resident": resident_bytes()}
+            self.frames.append(record)
+            if profile is not None:
+                self.profiles.append(profile)
+            self.frameDone.emit(record)
+
+    def stage(self, name):
+        """Context manager adding its wall time to `name` in the current frame"""
+        if self._stages is None:
+            return _NULL_STAGE
+        return self._timeStage(name)
+
+    @contextmanager
+    def _timeStage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            if self._stages is not None:
+                self._stages[name] = self._stages.get(name, 0.0) + time.perf_counter() - start
+
+    def record(self, name, seconds):
+        """Add a stage measured elsewhere (e.g. in a worker process) as a frame of its own"""
+        if not self.enabled:
+            return
+        record = {"name": name, "total": seconds, "stages": {}, "resident": resident_bytes()}
+        self.frames.append(record)
+        self.frameDone.emit(record)
+
+    def averages(self):
+        """Mean seconds of each stage over the kept frames that ran it"""
+        totals, counts = {}, {}
+        for record in self.frames:
+            for stage, seconds in record["stages"].items():
+                totals[stage] = totals.get(stage, 0.0) + seconds
+                counts[stage] = counts.get(stage, 0) + 1
+        return {stage: totals[stage] / counts[stage] for stage in totals}
+
+    def dump(self, path):
+        """Write the cProfile data of the recorded frames to a pstats file"""
+        if not self.profiles:
+            raise ValueError("No frames were recorded with cProfile")
+        stats = pstats.Stats(self.profiles[0])
+        for profile in list(self.profiles)[1:]:
+            stats.add(profile)
+        stats.dump_stats(path)
+        return len(self.profiles)
+
+
+# Shared by the window and the background loader
+profiler = Profiler(
+    enabled=os.environ.get("STATVIZ_PROFILE", "") not in ("", "0") or "--profile" in sys.argv
+)
+
+
+class ProfilerPanel(QDockWidget):
+    """Dock showing the stage times of the last frame and the process memory"""
+    def __init__(self, profiler, parent=None):
+        super().__init__("Profiler", parent)
+        self.setObjectName("profilerPanel")
+        self.profiler = profiler
+
+        widget = QWidget()
+        layout = QVBoxLayout(widget)
+        self.label = QLabel("Waiting for a redraw...")
+        self.label.setFont(QFont("Consolas", 9))
+        self.label.setTextInteractionFlags(Qt.TextInteractionFlag.TextSelectableByMouse)
+        layout.addWidget(self.label)
+
+        buttons = QHBoxLayout()
+        self.recordCheck = QCheckBox("Record cProfile")
+        self.recordCheck.setToolTip(f"Profile the last {profiler.frames.maxlen} frames with cProfile (slower)")
+        self.recordCheck.toggled.connect(self.setRecording)
+        self.saveButton = QPushButton("Save Profile...")
+        self.saveButton.clicked.connect(self.saveProfile)
+        buttons.addWidget(self.recordCheck)
+        buttons.addWidget(self.saveButton)
+        layout.addLayout(buttons)
+        layout.addStretch()
+        self.setWidget(widget)
+
+        profiler.frameDone.connect(self.showFrame)
+
+    def setRecording(self, recording):
+        self.profiler.recording = recording
+        if not recording:
+            self.profiler.profiles.clear()
+
+    def showFrame(self, record):
+        """Show one frame's stages next to their average over the kept frames"""
+        if not self.isVisible():
+            return
+        averages = self.profiler.averages()
+        lines = [f"{record['name']}: {record['total'] * 1000:8.1f} ms", "",
+                 f"{'stage':<12}{'last':>9}{'mean':>9}"]
+        for stage, seconds in sorted(record["stages"].items(), key=lambda item: -item[1]):
+            lines.append(f"{stage:<12}{seconds * 1000:9.1f}{averages.get(stage, 0.0) * 1000:9.1f}")
+        if record["resident"] is not None:
+            lines += ["", f"memory {record['resident'] / 2**20:.0f} MB resident"]
+        self.label.setText("\n".join(lines))
+
+    def saveProfile(self):
+        """Write the recorded frames to a .prof file"""
+        if not self.profiler.profiles:
+            self.label.setText("Nothing recorded yet: tick Record cProfile, then redraw.")
+            return
+        path, _ = QFileDialog.getSaveFileName(self, "Save Profile", "redraws.prof",
+                                              "cProfile data (*.prof);;All Files (*)")
+        if path:
+            count = self.profiler.dump(path)
+            self.label.setText(f"Saved {count} frame(s) to {path}")
@@ -0,0 +1,178 @@
+"""Multi-resolution min/max/mean pyramid of a long series
+
+Level k holds one record per bucket of 2**k consecutive rows: the min and
+max with the rows they occur at, the mean and the count of non-missing
+values. Levels start at 2**BASE_LEVEL rows (below that, decimating the
+rows themselves is just as fast) and halve until a level has no more
+than TOP_BUCKETS buckets. All levels are stored one after the other in a
+single record array, which is what gets saved next to a cached column and
+memory-mapped again, about a third of the size of the float64 column.
+
+minmax_indices then serves any zoom window from the coarsest level whose
+buckets are no wider than a pixel, touching O(visible buckets) records
+instead of every visible row, and returns the same kind of row indices as
+decimation.minmax_indices (at most twice as many).
+"""
+import os
+
+import numpy as np
+
+from decimation import minmax_indices as row_minmax_indices
+
+BASE_LEVEL = 5
+TOP_BUCKETS = 64
+
+# Shorter columns are decimated from their rows directly
+MIN_ROWS = 1 << 15
+
+
+def _record_dtype(rows):
+    index = np.int32 if rows < 2**31 else np.int64
+    return np.dtype([("argmin", index), ("argmax", index), ("min", float), ("max", float),
+                     ("mean", float), ("count", index)])
+
+
+def level_sizes(rows):
+    """Bucket count of every level, from BASE_LEVEL up"""
+    sizes = []
+    level = BASE_LEVEL
+    while True:
+        size = -(-rows // (1 << level))
+        sizes.append(size)
+        if size <= TOP_BUCKETS:
+            return sizes
+        level += 1
+
+
+def _reduce_rows(values, size, records):
+    """Fill the records of the first level from the rows, `size` rows per bucket"""
+    rows = len(values)
+    nan = np.isnan(values)
+    low = np.where(nan, np.inf, values)
+    high = np.where(nan, -np.inf, values)
+    zeroed = np.where(nan, 0.0, values)
+    full = rows // size
+    parts = [(0, full * size, full)]
+    if full * size < rows:
+        parts.append((full * size, rows, 1))
+    for start, stop, buckets in parts:
+        if buckets == 0:
+            continue
+        out = records[start // size:start // size + buckets]
+        width = (stop - start) // buckets
+        offsets = start + np.arange(buckets) * width
+        out["argmin"] = low[start:stop].reshape(buckets, width).argmin(axis=1) + offsets
+        out["argmax"] = high[start:stop].reshape(buckets, width).argmax(axis=1) + offsets
+        out["count"] = (~nan[start:stop]).reshape(buckets, width).sum(axis=1)
+        sums = zeroed[start:stop].reshape(buckets, width).sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            out["mean"] = np.where(out["count"] > 0, sums / out["count"], np.nan)
+    records["min"] = values[records["argmin"]]
+    records["max"] = values[records["argmax"]]
+
+
+def _reduce_level(lower, records):
+    """Fill the records of a level from the level below, two buckets per bucket"""
+    pairs = len(lower) // 2
+    odd = len(lower) % 2
+    if odd:
+        records[-1] = lower[-1]
+    if pairs == 0:
+        return
+    left, right = lower[0:2 * pairs:2], lower[1:2 * pairs:2]
+    out = records[:pairs]
+    # NaN (an all-missing bucket) never wins against a value
+    takeRight = np.isnan(left["min"]) | (right["min"] < left["min"])
+    out["argmin"] = np.where(takeRight, right["argmin"], left["argmin"])
+    out["min"] = np.where(takeRight, right["min"], left["min"])
+    takeRight = np.isnan(left["max"]) | (right["max"] > left["max"])
+    out["argmax"] = np.where(takeRight, right["argmax"], left["argmax"])
+    out["max"] = np.where(takeRight, right["max"], left["max"])
+    out["count"] = left["count"] + right["count"]
+    sums = np.where(left["count"] > 0, left["mean"] * left["count"], 0.0)
+    sums += np.where(right["count"] > 0, right["mean"] * right["count"], 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out["mean"] = np.where(out["count"] > 0, sums / out["count"], np.nan)
+
+
+class Pyramid:
+    """The levels of a series of `rows` values, as views into one record array"""
+    def __init__(self, data, rows):
+        self.data = data
+        self.rows = rows
+        self.levels = []
+        offset = 0
+        for size in level_sizes(rows):
+            self.levels.append(data[offset:offset + size])
+            offset += size
+        if offset != len(data):
+            raise ValueError(f"pyramid of {len(data)} records does not fit {rows} rows")
+
+    @classmethod
+    def build(cls, values):
+        """Pyramid of a 1-D float series (NaN for missing values)"""
+        values = np.asarray(values, dtype=float)
+        sizes = level_sizes(len(values))
+        data = np.empty(sum(sizes), dtype=_record_dtype(len(values)))
+        pyramid = cls(data, len(values))
+        _reduce_rows(values, 1 << BASE_LEVEL, pyramid.levels[0])
+        for lower, level in zip(pyramid.levels, pyramid.levels[1:]):
+            _reduce_level(lower, level)
+        return pyramid
+
+    @classmethod
+    def load(cls, path, rows, mmap=True):
+        """Pyramid saved with save(), memory-mapped by default"""
+        data = np.load(path, mmap_mode="r" if mmap else None, allow_pickle=False)
+        return cls(data.view(np.ndarray), rows)
+
+    def save(self, path):
+        """Write the records to a .npy file, atomically"""
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as f:
+            np.save(f, self.data, allow_pickle=False)
+        os.replace(temporary, path)
+
+    @property
+    def nbytes(self):
+        return self.data.nbytes
+
+    def bucketSize(self, level):
+        """Rows per bucket of the level at position `level` in self.levels"""
+        return 1 << (BASE_LEVEL + level)
+
+    def minmax_indices(self, y, start, stop, buckets):
+        """Sorted row indices of the min and max of each of ~buckets buckets of y[start:stop]
+
+        y is only read near the edges of the window, where it does not line
+        up with the pyramid's buckets.
+        """
+        start, stop, buckets = int(start), int(stop), max(int(buckets), 1)
+        rows = stop - start
+        size = -(-rows // buckets)
+        level = size.bit_length() - 1 - BASE_LEVEL
+        # Small windows are as quick to decimate from the rows
+        if level < 0 or rows < MIN_ROWS or rows <= 2 * buckets:
+            return row_minmax_indices(y[start:stop], buckets) + start
+        level = min(level, len(self.levels) - 1)
+        width = self.bucketSize(level)
+        first = -(-start // width)
+        last = stop // width
+        if last - first < 1:
+            return row_minmax_indices(y[start:stop], buckets) + start
+
+        # Whole buckets of the level: between one and two per pixel
+        records = self.levels[level][first:last]
+        idx = [records["argmin"], records["argmax"]]
+        # The partial buckets at both edges, from the rows themselves
+        for edgeStart, edgeStop in ((start, first * width), (last * width, stop)):
+            if edgeStop > edgeStart:
+                idx.append(row_minmax_indices(y[edgeStart:edgeStop], 1) + edgeStart)
+
+        idx = np.unique(np.concatenate(idx).astype(np.int64))
+        if idx[0] != start:
+            idx = np.r_[start, idx]
+        if idx[-1] != stop - 1:
+            idx = np.r_[idx, stop - 1]
+        return idx
+
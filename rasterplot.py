@@ -0,0 +1,535 @@
+"""Time series plot painted with QPainter, for smooth pan and zoom of long series
+
+RasterPlot is the "raster" backend of plotbackends. A repaint only maps the
+already decimated points of the visible lines (about two per pixel column)
+to pixels and strokes them with Qt's software rasterizer, so dragging or
+zooming a 10^7-row dataset costs the same as a short one; the window
+re-decimates the lines for the new range (from their pyramids) once the
+view stops moving. Nothing needs a GPU or OpenGL.
+
+Qt strokes a wide polyline as one outline, which gets very slow when a
+dense min/max envelope keeps crossing itself, while one-pixel (cosmetic)
+lines are drawn directly. Lines with more points than pixel columns are
+therefore drawn as round(width) one-pixel polylines a pixel apart, without
+antialiasing; sparser lines are drawn with their own pen, antialiased.
+"""
+import time
+
+import numpy as np
+from matplotlib import colormaps, colors as mcolors, dates as mdates, ticker as mticker
+from PyQt6.QtCore import QPointF, QRectF, Qt
+from PyQt6.QtGui import QColor, QFont, QFontMetricsF, QPainter, QPen, QPolygonF
+from PyQt6.QtWidgets import QHBoxLayout, QLabel, QPushButton, QVBoxLayout, QWidget
+
+import figures
+from profiling import profiler
+
+# matplotlib line styles -> Qt pen styles
+PEN_STYLES = {
+    "-": Qt.PenStyle.SolidLine, "--": Qt.PenStyle.DashLine,
+    ":": Qt.PenStyle.DotLine, "-.": Qt.PenStyle.DashDotLine,
+}
+
+# Colors of lines plotted without one, in turn as matplotlib's default cycle
+COLOR_CYCLE = colormaps["tab10"].colors
+
+# Autoscaled limits are padded by this fraction of the data range, as in matplotlib
+MARGIN = 0.05
+
+# View span scale per wheel notch
+ZOOM_STEP = 0.8
+
+# Pixel coordinates are clamped to +-MAX_PIXEL: points far outside a
+# zoomed-in view (until the line is re-decimated) would overflow the rasterizer
+MAX_PIXEL = float(1 << 22)
+
+
+def polygon(x, y):
+    """QPolygonF of the points (x, y), filled through its buffer rather than point by point"""
+    points = QPolygonF()
+    n = len(x)
+    if n == 0:
+        return points
+    points.resize(n)
+    buffer = points.data()
+    buffer.setsize(n * 16)
+    array = np.frombuffer(buffer, dtype=np.float64).reshape(n, 2)
+    array[:, 0] = x
+    array[:, 1] = y
+    return points
+
+
+def finite_runs(finite):
+    """(start, stop) of every run of consecutive True values"""
+    edges = np.flatnonzero(np.diff(np.r_[False, finite, False].astype(np.int8)))
+    return edges.reshape(-1, 2)
+
+
+def padded(low, high):
+    """Limits of a data range with MARGIN on each side; a single value gets a unit range"""
+    span = high - low
+    if span <= 0:
+        span = abs(low) or 1.0
+        return low - span * MARGIN * 10, high + span * MARGIN * 10
+    return low - span * MARGIN, high + span * MARGIN
+
+
+def format_numbers(ticks):
+    """Fixed-point labels with the fewest decimals telling the ticks apart"""
+    if len(ticks) == 0:
+        return []
+    if np.abs(ticks).max() >= 1e9:
+        return [f"{tick:.6g}" for tick in ticks]
+    step = np.diff(ticks).min() if len(ticks) > 1 else abs(ticks[0]) or 1.0
+    for decimals in range(7):
+        if np.allclose(ticks, np.round(ticks, decimals), rtol=0, atol=step * 1e-3):
+            break
+    # Rounding must not leave "-0"
+    return [f"{tick if round(tick, decimals) else 0.0:.{decimals}f}" for tick in ticks]
+
+
+def axis_ticks(low, high, count, kind="numeric", labels=None):
+    """(positions, labels) of about `count` ticks between low and high on an axis of `kind`"""
+    count = max(int(count), 2)
+    if kind == "datetime":
+        locator = mdates.AutoDateLocator(minticks=2, maxticks=count)
+        try:
+            positions = locator.tick_values(mdates.num2date(low), mdates.num2date(high))
+        except ValueError:
+            # Panned out of the representable dates
+            return np.empty(0), []
+    else:
+        locator = mticker.MaxNLocator(nbins=count, integer=kind == "text")
+        positions = locator.tick_values(low, high)
+    positions = positions[(positions >= low) & (positions <= high)]
+    if len(positions) == 0:
+        return positions, []
+    if kind == "datetime":
+        return positions, mdates.ConciseDateFormatter(locator).format_ticks(positions)
+    if kind == "text":
+        return positions, [str(labels[int(tick)]) if 0 <= tick < len(labels) else "" for tick in positions]
+    return positions, format_numbers(positions)
+
+
+class _Line:
+    """Decimated points of one line, its pen and its matplotlib style for exports"""
+    def __init__(self, style):
+        self.style = style
+        self.label = style.get("label")
+        rgba = mcolors.to_rgba(style["color"], style.get("alpha"))
+        self.pen = QPen(QColor.fromRgbF(*rgba), style.get("linewidth", 1.5))
+        self.pen.setStyle(PEN_STYLES.get(style.get("linestyle", "-"), Qt.PenStyle.SolidLine))
+        # Dense lines: `strokes` one-pixel polylines
+        self.thinPen = QPen(self.pen)
+        self.thinPen.setWidth(1)
+        self.thinPen.setCosmetic(True)
+        self.strokes = max(round(self.pen.widthF()), 1)
+        self.visible = True
+        self.setData(np.empty(0), np.empty(0))
+
+    def setData(self, x, y):
+        """Store the points; datetime x values are kept and mapped to matplotlib date numbers"""
+        self.x = np.asarray(x)
+        self.xnum = mdates.date2num(self.x) if self.x.dtype.kind == "M" else self.x.astype(float)
+        self.y = np.asarray(y, dtype=float)
+        finite = np.isfinite(self.xnum) & np.isfinite(self.y)
+        self.bounds = None
+        if finite.any():
+            x, y = self.xnum[finite], self.y[finite]
+            self.bounds = (x.min(), x.max(), y.min(), y.max())
+
+
+class _View:
+    """Limits, labels and lines of one dataset"""
+    def __init__(self, xlabel=None, kind="numeric", labels=None, title=""):
+        self.xlabel = xlabel
+        self.kind = kind
+        self.labels = labels
+        self.title = title
+        self.lines = []
+        self.cycledColors = 0
+        self.autoscale = True
+        self.xlim = (0.0, 1.0)
+        self.ylim = (0.0, 1.0)
+
+    def visibleLines(self):
+        return [line for line in self.lines if line.visible]
+
+    def autoscaleLimits(self):
+        """Fit the limits to the visible lines, padded like matplotlib's autoscale"""
+        bounds = [line.bounds for line in self.visibleLines() if line.bounds is not None]
+        if not bounds:
+            return
+        bounds = np.array(bounds)
+        self.xlim = padded(bounds[:, 0].min(), bounds[:, 1].max())
+        self.ylim = padded(bounds[:, 2].min(), bounds[:, 3].max())
+
+
+class RasterCanvas(QWidget):
+    """Paints the current view of a RasterPlot and turns drags and wheel turns into view changes
+
+    Inside the axes both directions pan and zoom; over the tick labels of
+    an axis only that axis does. A double click restores autoscaling.
+    """
+    def __init__(self, plot):
+        super().__init__()
+        self.plot = plot
+        self.area = QRectF()
+        self.dragStart = None
+        self.setMinimumSize(200, 150)
+        self.titleFont = QFont(self.font())
+        self.titleFont.setPointSize(13)
+        self.titleFont.setBold(True)
+        self.labelFont = QFont(self.font())
+        self.labelFont.setPointSize(10)
+        self.labelFont.setWeight(QFont.Weight.DemiBold)
+        self.tickFont = QFont(self.font())
+        self.tickFont.setPointSize(9)
+
+    def plotArea(self, yLabels=()):
+        """Rectangle of the axes, leaving room for the title, tick labels and x label"""
+        metrics = QFontMetricsF(self.tickFont)
+        top = QFontMetricsF(self.titleFont).height() * 2
+        bottom = metrics.height() * 2 + QFontMetricsF(self.labelFont).height() * 1.5
+        left = max([metrics.horizontalAdvance(label) for label in yLabels] + [metrics.horizontalAdvance("0.00")])
+        left += metrics.height()
+        right = metrics.height() * 1.5
+        return QRectF(left, top, max(self.width() - left - right, 1.0), max(self.height() - top - bottom, 1.0))
+
+    def resizeEvent(self, event):
+        self.area = self.plotArea()
+        super().resizeEvent(event)
+
+    def toPixels(self, view, x, y):
+        """Pixel coordinates of data coordinates in the current area"""
+        area = self.area
+        sx = area.width() / (view.xlim[1] - view.xlim[0])
+        sy = area.height() / (view.ylim[1] - view.ylim[0])
+        px = np.clip(area.left() + (x - view.xlim[0]) * sx, -MAX_PIXEL, MAX_PIXEL)
+        py = np.clip(area.bottom() - (y - view.ylim[0]) * sy, -MAX_PIXEL, MAX_PIXEL)
+        return px, py
+
+    def paintEvent(self, event):
+        start = time.perf_counter()
+        view = self.plot.view
+        colors = figures.THEMES[self.plot.theme]
+        text = QColor(colors["text"])
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor(colors["figure"]))
+
+        # The left margin fits the widest y tick label
+        yTicks, yLabels = axis_ticks(*view.ylim, self.height() / 60)
+        self.area = area = self.plotArea(yLabels)
+        xTicks, xLabels = axis_ticks(*view.xlim, area.width() / 110, view.kind, view.labels)
+        xPixels, _ = self.toPixels(view, xTicks, np.zeros(len(xTicks)))
+        _, yPixels = self.toPixels(view, np.zeros(len(yTicks)), yTicks)
+
+        painter.fillRect(area, QColor(colors["axes"]))
+        grid = QColor(colors["grid"])
+        grid.setAlphaF(colors["gridAlpha"])
+        painter.setPen(QPen(grid, 0.8))
+        for x in xPixels:
+            painter.drawLine(QPointF(x, area.top()), QPointF(x, area.bottom()))
+        for y in yPixels:
+            painter.drawLine(QPointF(area.left(), y), QPointF(area.right(), y))
+
+        painter.save()
+        painter.setClipRect(area)
+        for line in view.visibleLines():
+            self.drawLine(painter, view, line)
+        painter.restore()
+
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing, False)
+        painter.setPen(QPen(QColor(colors["spines"]), 1))
+        painter.drawRect(area)
+        self.drawTickLabels(painter, colors, xPixels, xLabels, yPixels, yLabels)
+
+        painter.setPen(text)
+        painter.setFont(self.titleFont)
+        painter.drawText(QRectF(0, 0, self.width(), area.top()), Qt.AlignmentFlag.AlignCenter, view.title)
+        if view.xlabel is not None:
+            painter.setFont(self.labelFont)
+            labelHeight = QFontMetricsF(self.labelFont).height() * 1.5
+            painter.drawText(QRectF(area.left(), self.height() - labelHeight, area.width(), labelHeight),
+                             Qt.AlignmentFlag.AlignCenter, str(view.xlabel))
+        self.drawLegend(painter, view, colors)
+        painter.end()
+        profiler.record("paint", time.perf_counter() - start)
+
+    def drawLine(self, painter, view, line):
+        px, py = self.toPixels(view, line.xnum, line.y)
+        dense = len(px) > self.area.width()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing, not dense)
+        painter.setPen(line.thinPen if dense else line.pen)
+        for start, stop in finite_runs(np.isfinite(px) & np.isfinite(py)):
+            if stop - start < 2:
+                continue
+            points = polygon(px[start:stop], py[start:stop])
+            if not dense:
+                painter.drawPolyline(points)
+                continue
+            for stroke in range(line.strokes):
+                painter.drawPolyline(points.translated(0, stroke))
+
+    def drawTickLabels(self, painter, colors, xPixels, xLabels, yPixels, yLabels):
+        area = self.area
+        metrics = QFontMetricsF(self.tickFont)
+        gap = metrics.height() / 3
+        tick, color = QPen(QColor(colors["spines"]), 1), QColor(colors["text"])
+        painter.setFont(self.tickFont)
+        for x, label in zip(xPixels, xLabels):
+            painter.setPen(tick)
+            painter.drawLine(QPointF(x, area.bottom()), QPointF(x, area.bottom() + gap))
+            painter.setPen(color)
+            width = metrics.horizontalAdvance(label)
+            painter.drawText(QPointF(x - width / 2, area.bottom() + gap + metrics.ascent()), label)
+        for y, label in zip(yPixels, yLabels):
+            painter.setPen(tick)
+            painter.drawLine(QPointF(area.left() - gap, y), QPointF(area.left(), y))
+            painter.setPen(color)
+            width = metrics.horizontalAdvance(label)
+            painter.drawText(QPointF(area.left() - 2 * gap - width, y + metrics.ascent() / 2 - 1), label)
+
+    def drawLegend(self, painter, view, colors):
+        """Labels of the visible lines in the upper left corner of the axes"""
+        lines = [line for line in view.visibleLines() if line.label]
+        if not lines:
+            return
+        metrics = QFontMetricsF(self.tickFont)
+        rowHeight = metrics.height() * 1.2
+        sample = metrics.height() * 2
+        pad = metrics.height() / 2
+        width = max(metrics.horizontalAdvance(str(line.label)) for line in lines) + sample + 3 * pad
+        box = QRectF(self.area.left() + pad, self.area.top() + pad, width, rowHeight * len(lines) + pad)
+        background = QColor(colors["axes"])
+        background.setAlphaF(0.9)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing, True)
+        painter.setPen(QPen(QColor(colors["spines"]), 1))
+        painter.setBrush(background)
+        painter.drawRoundedRect(box, 4, 4)
+        painter.setBrush(Qt.BrushStyle.NoBrush)
+        painter.setFont(self.tickFont)
+        for row, line in enumerate(lines):
+            y = box.top() + pad / 2 + rowHeight * (row + 0.5)
+            painter.setPen(line.pen)
+            painter.drawLine(QPointF(box.left() + pad, y), QPointF(box.left() + pad + sample, y))
+            painter.setPen(QColor(colors["text"]))
+            painter.drawText(QPointF(box.left() + 2 * pad + sample, y + metrics.ascent() / 2 - 1), str(line.label))
+
+    def axesAt(self, position):
+        """Axes a drag or wheel turn at position acts on: "x", "y" or "xy" """
+        if position.x() < self.area.left():
+            return "y"
+        if position.y() > self.area.bottom():
+            return "x"
+        return "xy"
+
+    def mousePressEvent(self, event):
+        if event.button() == Qt.MouseButton.LeftButton:
+            view = self.plot.view
+            self.dragStart = (event.position(), view.xlim, view.ylim, self.axesAt(event.position()))
+
+    def mouseMoveEvent(self, event):
+        if self.dragStart is None:
+            return
+        position, xlim, ylim, axes = self.dragStart
+        delta = event.position() - position
+        dx = -delta.x() / self.area.width() * (xlim[1] - xlim[0]) if "x" in axes else 0.0
+        dy = delta.y() / self.area.height() * (ylim[1] - ylim[0]) if "y" in axes else 0.0
+        self.plot.setLimits((xlim[0] + dx, xlim[1] + dx), (ylim[0] + dy, ylim[1] + dy))
+
+    def mouseReleaseEvent(self, event):
+        self.dragStart = None
+
+    def mouseDoubleClickEvent(self, event):
+        self.plot.resetView()
+
+    def wheelEvent(self, event):
+        steps = event.angleDelta().y() / 120
+        if not steps:
+            return
+        view = self.plot.view
+        scale = ZOOM_STEP ** steps
+        position = event.position()
+        axes = self.axesAt(position)
+        xlim, ylim = view.xlim, view.ylim
+        if "x" in axes:
+            x = xlim[0] + (position.x() - self.area.left()) / self.area.width() * (xlim[1] - xlim[0])
+            xlim = (x + (xlim[0] - x) * scale, x + (xlim[1] - x) * scale)
+        if "y" in axes:
+            y = ylim[0] + (self.area.bottom() - position.y()) / self.area.height() * (ylim[1] - ylim[0])
+            ylim = (y + (ylim[0] - y) * scale, y + (ylim[1] - y) * scale)
+        self.plot.setLimits(xlim, ylim)
+        event.accept()
+
+
+class RasterPlot:
+    """The time series plot painted by a RasterCanvas, one view (limits and lines) per dataset
+
+    Implements the plotbackends interface; see that module.
+    """
+    def __init__(self, parent, xlimChanged):
+        self.xlimChanged = xlimChanged
+        self.theme = "light"
+        self.views = {}
+        self.lines = {}
+        self.placeholder = _View(title="Load a dataset to begin")
+        self.view = self.placeholder
+        self.canvas = RasterCanvas(self)
+
+        # Stands in for the matplotlib navigation toolbar
+        hint = QLabel("Drag to pan, scroll to zoom (over the tick labels: that axis only), "
+                      "double-click to reset")
+        hint.setObjectName("plotHint")
+        resetButton = QPushButton("Reset View")
+        resetButton.setToolTip("Fit the view to the visible lines again")
+        resetButton.clicked.connect(self.resetView)
+        bar = QHBoxLayout()
+        bar.addWidget(hint, 1)
+        bar.addWidget(resetButton)
+
+        self.widget = QWidget()
+        layout = QVBoxLayout(self.widget)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addLayout(bar)
+        layout.addWidget(self.canvas, 1)
+
+    def hasDataset(self, name):
+        return name in self.views
+
+    def addDataset(self, name, xlabel, kind, labels=None):
+        self.views[name] = _View(xlabel, kind or "numeric", labels)
+
+    def removeDataset(self, name):
+        """Drop the view of a dataset and its lines"""
+        view = self.views.pop(name)
+        for key in [key for key in self.lines if key[0] == name]:
+            del self.lines[key]
+        if view is self.view:
+            self.view = self.placeholder
+
+    def showDataset(self, name):
+        """Make the view of a dataset current; True when the displayed view changed"""
+        previous, self.view = self.view, self.views[name]
+        return self.view is not previous
+
+    def isShown(self, name):
+        return self.views.get(name) is self.view
+
+    def hasLine(self, key):
+        return key in self.lines
+
+    def addLine(self, key, x, y, **style):
+        view = self.views[key[0]]
+        if style.get("color") is None:
+            style["color"] = COLOR_CYCLE[view.cycledColors % len(COLOR_CYCLE)]
+            view.cycledColors += 1
+        line = _Line(style)
+        line.setData(x, y)
+        self.lines[key] = line
+        view.lines.append(line)
+
+    def setLineData(self, key, x, y):
+        self.lines[key].setData(x, y)
+
+    def lineVisible(self, key):
+        return self.lines[key].visible
+
+    def setLineVisible(self, key, visible):
+        self.lines[key].visible = visible
+
+    def refresh(self, datasetName, switched=False):
+        """Repaint after lines were shown, hidden or changed"""
+        self.view.title = datasetName if self.view.visibleLines() else "No numeric data selected"
+        self.redraw()
+
+    def setTitle(self, title):
+        self.view.title = title
+        self.canvas.update()
+
+    def plotWidth(self):
+        """Width of the axes in pixels, i.e. the number of decimation buckets"""
+        return max(int(self.canvas.area.width()), 100)
+
+    def exportFigsize(self):
+        """Size in inches of the figure savefig draws: the canvas size at 100 dpi"""
+        return (max(self.canvas.width(), 400) / 100, max(self.canvas.height(), 300) / 100)
+
+    def exportWidth(self, dpi):
+        """Width of the axes in pixels when savefig saves at dpi"""
+        fig = figures.agg_figure(figsize=self.exportFigsize())
+        return max(int(fig.axes[0].get_position().width * fig.get_figwidth() * dpi), 100)
+
+    def viewXlim(self):
+        """Visible x range when panned or zoomed, None while the view autoscales"""
+        return None if self.view.autoscale else self.view.xlim
+
+    def markDecimated(self):
+        """x range the lines are about to be decimated for: None (all rows) while autoscaling"""
+        return self.viewXlim()
+
+    def setLimits(self, xlim, ylim):
+        """Show a panned or zoomed range; the lines are re-decimated when the x range changed"""
+        if not (np.all(np.isfinite(xlim + ylim)) and xlim[1] > xlim[0] and ylim[1] > ylim[0]):
+            return
+        view = self.view
+        xChanged = xlim != view.xlim or view.autoscale
+        view.autoscale = False
+        view.xlim, view.ylim = xlim, ylim
+        self.canvas.update()
+        if xChanged:
+            self.xlimChanged()
+
+    def resetView(self):
+        """Autoscale again; the lines are re-decimated over all rows"""
+        self.view.autoscale = True
+        self.view.autoscaleLimits()
+        self.canvas.update()
+        self.xlimChanged()
+
+    def setTheme(self, theme):
+        self.theme = theme
+        self.canvas.update()
+
+    def draw(self):
+        self.canvas.update()
+
+    def redraw(self):
+        if self.view.autoscale:
+            with profiler.stage("autoscale"):
+                self.view.autoscaleLimits()
+        self.canvas.update()
+
+    def clear(self):
+        """Remove every dataset and line, back to the placeholder view"""
+        self.views.clear()
+        self.lines.clear()
+        self.view = self.placeholder
+
+    def savefig(self, path, **kwargs):
+        """Draw the current view with matplotlib and save it, as Figure.savefig"""
+        view = self.view
+        fig = figures.agg_figure(figsize=self.exportFigsize(), theme=self.theme)
+        ax = fig.axes[0]
+        lines = view.visibleLines()
+        for line in lines:
+            ax.plot(line.x, line.y, **line.style)
+        if view.kind == "datetime":
+            ax.tick_params(axis="x", labelrotation=30)
+        elif view.kind == "text":
+            labels = view.labels
+            ax.xaxis.set_major_formatter(mticker.FuncFormatter(
+                lambda value, pos: labels[int(value)] if 0 <= value < len(labels) else ""
+            ))
+        if lines:
+            ax.set_title(view.title, fontsize=13, fontweight="bold", pad=15)
+            loc = "best" if len(lines) <= 10 else "upper left"
+            ax.legend(loc=loc, fontsize=9, framealpha=0.9, fancybox=True, shadow=True)
+        else:
+            ax.set_title(view.title)
+        if view.xlabel is not None:
+            ax.set_xlabel(view.xlabel, fontweight="600", fontsize=10)
+        if not view.autoscale:
+            ax.set_xlim(view.xlim)
+            ax.set_ylim(view.ylim)
+        fig.savefig(path, **kwargs)
@@ -0,0 +1,245 @@
+"""Headless batch report: statistics and plot exports for many CSV files
+
+Usage:
+
+    python report.py DATA [DATA ...] -o OUTPUT [--format png svg] [--lags 50]
+                     [--overlay SES] [--workers N] [--no-cache] [--summary-only]
+
+DATA may be CSV files, directories (every *.csv inside) or glob patterns.
+For every numeric column of every dataset this writes one row of
+OUTPUT/summary.csv (count, missing values, mean, variance, standard
+deviation, min, quartiles, max, lag-1 autocorrelation), the ACF of each
+dataset to OUTPUT/<dataset>/acf.csv and a figure of the series and its ACF
+to OUTPUT/<dataset>/<column>.<format>. With --summary-only only
+summary.csv is written, from a single chunked pass over each file
+(chunkstats), so files larger than memory work too; its quartiles are
+then approximate. Datasets are processed in parallel in a process pool.
+Only the Agg backend is used, so no display or QApplication is needed.
+"""
+import argparse
+import csv
+import glob
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from autocorrelation import acf, confidence_bound, max_lag
+from chunkstats import CHUNK_ROWS, DEFAULT_QUANTILES, quantile_label, summarize_csv
+from dataio import dataset_name, read_dataset, safe_filename
+from datasetcache import DatasetCache, cache_dataset
+from figures import agg_figure, plot_decimated, plot_values
+from transforms import OVERLAY_TRANSFORMS, apply_overlay_block
+
+QUANTILE_FIELDS = [quantile_label(q) for q in DEFAULT_QUANTILES]
+SUMMARY_FIELDS = (["dataset", "column", "count", "missing", "mean", "variance", "std", "min"]
+                  + QUANTILE_FIELDS + ["max", "acf1"])
+
+
+def find_datasets(inputs):
+    """Expand files, directories and glob patterns into a sorted list of CSV files"""
+    files = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            files.update(glob.glob(os.path.join(item, "*.csv")))
+        elif os.path.isfile(item):
+            files.add(item)
+        else:
+            files.update(glob.glob(item, recursive=True))
+    return sorted(files)
+
+
+def dataset_names(files):
+    """Unique dataset name of each file, by path
+
+    Files with the same name (data.csv in two folders) get a suffix, as in
+    the GUI, so their folders and summary rows are kept apart. Names are
+    compared as folder names, ignoring case for case-insensitive file systems.
+    """
+    names = {}
+    taken = set()
+    for path in files:
+        name = original = dataset_name(path)
+        counter = 1
+        while safe_filename(name).casefold() in taken:
+            name = f"{original}_{counter}"
+            counter += 1
+        taken.add(safe_filename(name).casefold())
+        names[path] = name
+    return names
+
+
+def load(path, useCache=True):
+    """Read a dataset, through the on-disk cache unless disabled"""
+    if not useCache:
+        return read_dataset(path)
+    result = cache_dataset(path)
+    return DatasetCache().load(result) if isinstance(result, str) else result
+
+
+def column_summary(values):
+    """Descriptive statistics of one column (NaNs ignored, sample variance)"""
+    finite = values[~np.isnan(values)]
+    count = len(finite)
+    if count == 0:
+        return {"count": 0, "missing": len(values), "mean": np.nan, "variance": np.nan, "std": np.nan,
+                "min": np.nan, "max": np.nan, **{field: np.nan for field in QUANTILE_FIELDS}}
+    variance = finite.var(ddof=1) if count > 1 else np.nan
+    return {
+        "count": count,
+        "missing": len(values) - count,
+        "mean": finite.mean(),
+        "variance": variance,
+        "std": np.sqrt(variance),
+        "min": finite.min(),
+        "max": finite.max(),
+        **dict(zip(QUANTILE_FIELDS, np.quantile(finite, DEFAULT_QUANTILES))),
+    }
+
+
+def render_column(paths, name, xValues, xLabel, y, acfValues, bound, overlays, dpi):
+    """Save a figure of one column (with overlays) above its autocorrelation to every path"""
+    fig = agg_figure(2, 1, figsize=(10, 7), dpi=dpi, gridspec_kw={"height_ratios": [2, 1]})
+    seriesAx, acfAx = fig.axes
+    width = int(seriesAx.bbox.width)
+
+    plot_decimated(seriesAx, xValues, y, width, label=name, color="#1f77b4", linewidth=1.2)
+    for overlay, values in overlays.items():
+        plot_decimated(seriesAx, xValues, values, width, label=f"{name} ({overlay})",
+                       linestyle="--", linewidth=1.2, alpha=0.8)
+    seriesAx.set_title(name, fontsize=13, fontweight="bold")
+    seriesAx.set_xlabel(xLabel)
+    seriesAx.legend(loc="upper left", fontsize=9)
+
+    lags = np.arange(1, len(acfValues))
+    acfAx.axhspan(-bound, bound, color="#89b4fa", alpha=0.2, linewidth=0)
+    acfAx.axhline(0, color="#6c7086", linewidth=0.8)
+    acfAx.vlines(lags, 0, acfValues[1:], color="#1f77b4", linewidth=1.2)
+    acfAx.set_xlabel("Lag")
+    acfAx.set_title("Autocorrelation", fontsize=11)
+
+    # Fixed margins: tight_layout would lay out the date ticks again for every file
+    fig.subplots_adjust(left=0.08, right=0.97, top=0.94, bottom=0.08, hspace=0.35)
+    for path in paths:
+        fig.savefig(path, dpi=dpi)
+
+
+def report_dataset(path, outdir, formats=("png",), nlags=50, overlays=(), dpi=100, useCache=True, name=None):
+    """Write the statistics, ACF table and figures of one CSV file
+
+    The output folder and summary rows use `name` (default: the file name).
+    Returns the summary rows of its numeric columns.
+    """
+    df = load(path, useCache)
+    name = name or dataset_name(path)
+    rows = []
+    if df.empty:
+        return rows
+
+    xColumn = df.columns[0]
+    columns = [column for column in df.columns[1:] if pd.api.types.is_numeric_dtype(df[column])]
+    if not columns:
+        return rows
+
+    values = np.column_stack([df[column].to_numpy(dtype=float, na_value=np.nan) for column in columns])
+    nlags = max_lag(len(df), nlags)
+    acfs = acf(values, nlags)
+
+    datasetDir = os.path.join(outdir, safe_filename(name))
+    os.makedirs(datasetDir, exist_ok=True)
+    pd.DataFrame(acfs, columns=columns, index=pd.RangeIndex(nlags + 1, name="lag")).to_csv(
+        os.path.join(datasetDir, "acf.csv")
+    )
+
+    xValues = plot_values(df[xColumn])
+    overlayBlocks = {overlay: apply_overlay_block(values, overlay, df[xColumn].to_numpy()) for overlay in overlays}
+    for i, column in enumerate(columns):
+        y = values[:, i]
+        summary = column_summary(y)
+        rows.append({"dataset": name, "column": column, **summary,
+                     "acf1": acfs[1, i] if nlags >= 1 else np.nan})
+
+        overlaySeries = {overlay: block[:, i] for overlay, block in overlayBlocks.items()}
+        render_column(
+            [os.path.join(datasetDir, f"{safe_filename(column)}.{fmt}") for fmt in formats], column,
+            xValues, str(xColumn), y, acfs[:, i], confidence_bound(summary["count"]), overlaySeries, dpi
+        )
+    return rows
+
+
+def summarize_dataset(path, chunkRows=CHUNK_ROWS, name=None):
+    """Summary rows of one CSV file from a single chunked pass, without loading it"""
+    name = name or dataset_name(path)
+    rows = []
+    for column, stats in summarize_csv(path, lags=(1,), chunkRows=chunkRows)["columns"].items():
+        row = {"dataset": name, "column": column, "acf1": stats["acf"][1]}
+        row.update((field, stats[field]) for field in ("count", "missing", "mean", "variance", "std", "min", "max"))
+        row.update(zip(QUANTILE_FIELDS, stats["quantiles"].values()))
+        rows.append(row)
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("inputs", nargs="+", metavar="DATA",
+                        help="CSV files, directories or glob patterns")
+    parser.add_argument("-o", "--output", required=True, help="output directory")
+    parser.add_argument("--format", nargs="+", default=["png"], choices=["png", "svg", "pdf"],
+                        help="figure formats (default: png)")
+    parser.add_argument("--lags", type=int, default=50, help="ACF lags (default: 50)")
+    parser.add_argument("--overlay", action="append", default=[], choices=list(OVERLAY_TRANSFORMS),
+                        help="smoothing/trend overlay to draw, may be repeated")
+    parser.add_argument("--dpi", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--no-cache", action="store_true", help="always parse the CSV files")
+    parser.add_argument("--summary-only", action="store_true",
+                        help="only write summary.csv, reading each file once in chunks")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS,
+                        help=f"rows per chunk with --summary-only (default: {CHUNK_ROWS})")
+    args = parser.parse_args(argv)
+
+    files = find_datasets(args.inputs)
+    if not files:
+        parser.error("no CSV files found")
+    names = dataset_names(files)
+    os.makedirs(args.output, exist_ok=True)
+
+    start = time.perf_counter()
+    rows = []
+    failed = 0
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        if args.summary_only:
+            futures = {executor.submit(summarize_dataset, path, args.chunk_rows, names[path]): path for path in files}
+        else:
+            futures = {
+                executor.submit(report_dataset, path, args.output, tuple(args.format), args.lags,
+                                tuple(args.overlay), args.dpi, not args.no_cache, names[path]): path
+                for path in files
+            }
+        for done, future in enumerate(as_completed(futures), 1):
+            path = futures[future]
+            try:
+                datasetRows = future.result()
+            except Exception as e:
+                failed += 1
+                print(f"[{done}/{len(files)}] {path}: FAILED: {e}", file=sys.stderr)
+                continue
+            rows.extend(datasetRows)
+            print(f"[{done}/{len(files)}] {path}: {len(datasetRows)} column(s)")
+
+    rows.sort(key=lambda row: (row["dataset"], row["column"]))
+    with open(os.path.join(args.output, "summary.csv"), "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+    print(f"{len(files) - failed}/{len(files)} dataset(s), {len(rows)} column(s) "
+          f"in {time.perf_counter() - start:.1f} s -> {args.output}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,222 @@
+"""Calendar resampling of datetime-indexed datasets into daily, weekly, monthly or yearly buckets
+
+The bucket boundaries of an x column are computed once: since the
+timestamps are sorted, every bucket is a contiguous row range, found by
+a binary search for each period start. Every aggregation is then one
+ufunc.reduceat over those slices for all columns at once, with no
+grouping or hashing, and columns without missing values only index the
+first and last row of each bucket for first / last:
+
+    buckets = bucket_bounds(x, "M")
+    monthly = aggregate(block, buckets, "mean")
+
+    mean, sum   of the finite values of each bucket (missing when it has none)
+    last        last finite value of each bucket
+    ohlc        first, highest, lowest and last finite value, as a (4, buckets,
+                columns) array
+
+ResampledDataset serves the buckets of a datastore.Dataset through the same
+interface, so the window plots and transforms them like any other dataset.
+"""
+import numpy as np
+import pandas as pd
+
+RESOLUTIONS = ("D", "W", "M", "Y")
+AGGREGATIONS = ("mean", "sum", "last", "ohlc")
+
+# OHLC buckets are drawn as a path through their four values, spread over
+# the bucket at these fractions of its length
+OHLC_OFFSETS = (0.0, 0.25, 0.5, 0.75)
+
+
+def _periods(x, resolution):
+    """Period number of datetime64 values; bucket_label maps it back to the period start"""
+    if resolution == "D":
+        return x.astype("datetime64[D]").astype(np.int64)
+    if resolution == "W":
+        # Weeks start on Monday: 1970-01-01 (day 0) was a Thursday
+        return (x.astype("datetime64[D]").astype(np.int64) + 3) // 7
+    if resolution == "M":
+        return x.astype("datetime64[M]").astype(np.int64)
+    if resolution == "Y":
+        return x.astype("datetime64[Y]").astype(np.int64)
+    raise ValueError(f"unknown resolution {resolution!r}")
+
+
+def bucket_label(periods, resolution):
+    """Start of the given periods, as datetime64[ns]"""
+    periods = np.asarray(periods, dtype=np.int64)
+    if resolution == "W":
+        return (periods * 7 - 3).astype("datetime64[D]").astype("datetime64[ns]")
+    unit = {"D": "D", "M": "M", "Y": "Y"}[resolution]
+    return periods.astype(f"datetime64[{unit}]").astype("datetime64[ns]")
+
+
+def bucket_bounds(x, resolution):
+    """Buckets of a datetime x column: {"order", "starts", "labels", "ends"}
+
+    starts are the first row of each bucket in the (sorted) rows and
+    labels / ends the start of each bucket's period and of the next one.
+    order is None when x is sorted without missing timestamps; otherwise
+    it lists the rows with a timestamp in time order, and values are taken
+    in that order before being reduced.
+    """
+    x = np.asarray(x, dtype="datetime64[ns]")
+    valid = ~np.isnat(x)
+    order = None
+    if not valid.all() or np.any(x[1:] < x[:-1]):
+        rows = np.flatnonzero(valid)
+        order = rows[np.argsort(x[rows], kind="stable")]
+        x = x[order]
+
+    if not len(x):
+        starts = keys = np.empty(0, dtype=np.int64)
+    else:
+        # First row at or after each period start; periods without rows share
+        # their position with the next one and are dropped
+        first, last = _periods(x[[0, -1]], resolution)
+        periods = np.arange(first, last + 1)
+        positions = np.searchsorted(x, bucket_label(periods, resolution))
+        positions[0] = 0
+        occupied = np.r_[positions[1:] > positions[:-1], True]
+        starts, keys = positions[occupied], periods[occupied]
+    return {
+        "order": order,
+        "starts": starts,
+        "labels": bucket_label(keys, resolution),
+        "ends": bucket_label(keys + 1, resolution),
+    }
+
+
+def aggregate(block, buckets, aggregation):
+    """Reduce every column of a (rows, columns) block over the buckets of bucket_bounds
+
+    Returns (buckets, columns), or (4, buckets, columns) for "ohlc".
+    """
+    block = np.asarray(block, dtype=np.float64)
+    if block.ndim == 1:
+        block = block.reshape(-1, 1)
+    if buckets["order"] is not None:
+        block = block[buckets["order"]]
+    starts = buckets["starts"]
+    shape = (len(starts), block.shape[1])
+    if not len(starts):
+        return np.empty((4,) + shape if aggregation == "ohlc" else shape)
+
+    if aggregation not in AGGREGATIONS:
+        raise ValueError(f"unknown aggregation {aggregation!r}")
+    finite = np.isfinite(block)
+    complete = finite.all()
+    if aggregation in ("mean", "sum"):
+        if complete:
+            sums = np.add.reduceat(block, starts, axis=0)
+            return sums / np.diff(np.r_[starts, len(block)])[:, None] if aggregation == "mean" else sums
+        sums = np.add.reduceat(np.where(finite, block, 0.0), starts, axis=0)
+        counts = np.add.reduceat(finite, starts, axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(counts > 0, sums / counts if aggregation == "mean" else sums, np.nan)
+
+    if complete:
+        lastValues = block[np.r_[starts[1:], len(block)] - 1]
+        firstValues = block[starts]
+    else:
+        # Row of the last (first) finite value of each bucket, -1 (rows) when none
+        rows = np.arange(len(block))[:, None]
+        last = np.maximum.reduceat(np.where(finite, rows, -1), starts, axis=0)
+        lastValues = np.where(last >= 0, np.take_along_axis(block, np.maximum(last, 0), axis=0), np.nan)
+    if aggregation == "last":
+        return lastValues
+    if not complete:
+        first = np.minimum.reduceat(np.where(finite, rows, len(block)), starts, axis=0)
+        firstValues = np.where(first < len(block),
+                               np.take_along_axis(block, np.minimum(first, len(block) - 1), axis=0), np.nan)
+    # fmax / fmin skip missing values
+    return np.stack((firstValues, np.fmax.reduceat(block, starts, axis=0),
+                     np.fmin.reduceat(block, starts, axis=0), lastValues))
+
+
+def plot_positions(buckets, aggregation):
+    """x values of the aggregated rows: bucket starts, or four points per bucket for OHLC paths"""
+    labels = buckets["labels"]
+    if aggregation != "ohlc":
+        return labels
+    lengths = (buckets["ends"] - labels).astype(np.int64)
+    offsets = (np.asarray(OHLC_OFFSETS)[None, :] * lengths[:, None]).astype("timedelta64[ns]")
+    return (labels[:, None] + offsets).reshape(-1)
+
+
+def plot_values(values, aggregation):
+    """Aggregated (buckets, columns) values in plotting row order; OHLC rows interleaved per bucket"""
+    if aggregation != "ohlc":
+        return values
+    return np.moveaxis(values, 0, 1).reshape(-1, values.shape[2])
+
+
+class ResampledDataset:
+    """The buckets of a Dataset, with the Dataset interface the window plots through
+
+    The x column holds the plotted bucket positions (see plot_positions)
+    and each numeric column its aggregated values. With a cache (a
+    cache.SeriesCache) and key(column) giving its cache key, values() goes
+    through the cache, so each resolution and aggregation of a column is
+    computed once. Building one reduces nothing: the bucket boundaries are
+    passed in already computed.
+    """
+    def __init__(self, dataset, buckets, aggregation, cache=None, key=None):
+        self.dataset = dataset
+        self.buckets = buckets
+        self.aggregation = aggregation
+        self.cache = cache
+        self.key = key
+        self._x = plot_positions(buckets, aggregation)
+
+    @property
+    def columns(self):
+        return self.dataset.columns
+
+    @property
+    def empty(self):
+        return len(self) == 0 or len(self.columns) == 0
+
+    def __len__(self):
+        return len(self._x)
+
+    def __getitem__(self, column):
+        if column == self.columns[0]:
+            return pd.Series(self._x, name=column)
+        return pd.Series(self.values(column), name=column)
+
+    def dtype(self, column):
+        return self._x.dtype if column == self.columns[0] else np.dtype(np.float64)
+
+    def isNumeric(self, column):
+        return column != self.columns[0] and self.dataset.isNumeric(column)
+
+    def values(self, column):
+        """Aggregated float64 values of a numeric column, computed on first use"""
+        def compute():
+            return np.ascontiguousarray(
+                plot_values(aggregate(self.dataset.values(column), self.buckets, self.aggregation),
+                            self.aggregation)[:, 0]
+            )
+        if self.cache is None:
+            return compute()
+        return self.cache.get(self.key(column), compute)
+
+    def block(self, columns):
+        """Float64 (rows, columns) array of aggregated columns side by side"""
+        block = np.empty((len(self), len(columns)))
+        for i, column in enumerate(columns):
+            block[:, i] = self.values(column)
+        return block
+
+    def pyramid(self, column):
+        """Buckets are short enough to decimate directly"""
+        return None
+
+    def release(self, keep=()):
+        self.dataset.release(keep)
+
+    def frame(self):
+        return pd.DataFrame({column: self[column] for column in self.columns
+                             if column == self.columns[0] or self.isNumeric(column)})
@@ -0,0 +1,259 @@
+"""Following CSV files that keep growing
+
+TailReader parses only the rows appended since its last read, and the
+online overlays continue SES/DES/EMA/SMA from their last state in O(1) per
+new value, giving the same numbers as recomputing the batch transform over
+the whole column.
+"""
+import io
+import os
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+from dataio import SAMPLE_SIZE, datetime_format, parse_datetimes
+from datastore import GrowingArray
+from transforms import OVERLAY_TRANSFORMS, apply_overlay_block, double_ewm_mean, ewm_block, ewm_mean, rolling_mean
+
+# Bytes that are not blank for read_csv's skip_blank_lines
+_CONTENT = np.ones(256, dtype=bool)
+_CONTENT[list(b" \t\n\r\x0b\x0c")] = False
+
+
+class TailReader:
+    """Read the rows appended to a CSV file since the previous read
+
+    Only complete records are consumed; a partially written last row is
+    left for the next read. Appended values are converted to the dtypes of the
+    columns already loaded, so a datetime first column stays datetime,
+    parsed with the format inferred from the rows already in the file.
+    """
+    def __init__(self, path, rows, dtypes, chunkSize=1 << 20):
+        self.path = path
+        self.dtypes = dict(dtypes)
+        self.truncated = False
+        head = pd.read_csv(path, nrows=SAMPLE_SIZE)
+        self.timeFormat = datetime_format(head.columns, head[head.columns[0]]) if len(head.columns) else None
+        with open(path, "rb") as f:
+            self.header, self.offset = self._skipRecords(f, rows, chunkSize)
+
+    @staticmethod
+    def _completeRecords(data, limit=None):
+        """(end, count): offset just past the complete CSV records at the start of data, and their number
+
+        Records are split the way read_csv splits them: a line break inside
+        a quoted field does not end the record, and blank lines are skipped
+        without being counted. With a limit, stops after that many records.
+        Scanned with numpy, without a Python loop over the lines.
+        """
+        if limit is not None and limit <= 0:
+            return 0, 0
+        buf = np.frombuffer(data, dtype=np.uint8)
+        ends = np.flatnonzero(buf == ord("\n"))
+        if b'"' in data:
+            # A line break ends a record only after an even number of quotes
+            quotes = np.flatnonzero(buf == ord('"'))
+            ends = ends[np.searchsorted(quotes, ends) % 2 == 0]
+        if not ends.size:
+            return 0, 0
+        # Records holding anything but whitespace; only those starting with
+        # whitespace can be blank, so the bytes are checked only when one does
+        starts = np.r_[0, ends[:-1] + 1]
+        if _CONTENT[buf[starts]].all():
+            records = np.arange(ends.size)
+        else:
+            records = np.flatnonzero(np.logical_or.reduceat(_CONTENT[buf[:ends[-1] + 1]], starts))
+        if limit is not None and records.size >= limit:
+            return int(ends[records[limit - 1]]) + 1, limit
+        return int(ends[-1]) + 1, int(records.size)
+
+    @classmethod
+    def _skipRecords(cls, f, count, chunkSize):
+        """(header, offset): the header record of f and the offset just past the next `count` records"""
+        header = None
+        offset = 0
+        # Bytes of a record not yet complete in the chunks read so far
+        pending = b""
+        while True:
+            chunk = f.read(chunkSize)
+            pending += chunk
+            if header is None:
+                end, found = cls._completeRecords(pending, 1)
+                if found:
+                    header, offset, pending = pending[:end], end, pending[end:]
+            if header is not None and count > 0:
+                end, found = cls._completeRecords(pending, count)
+                count -= found
+                offset += end
+                pending = pending[end:]
+            if not chunk:
+                break
+            if header is not None and count == 0:
+                return header, offset
+        if header is None:
+            return pending, len(pending)
+        # The last row had no line break yet when it was loaded
+        return header, offset + len(pending)
+
+    def read(self):
+        """Return the newly appended rows as a DataFrame, or None when there are none
+
+        A file that became shorter than what was already read (truncated or
+        replaced) sets `truncated` and is not read any further.
+        """
+        if self.truncated:
+            return None
+        size = os.path.getsize(self.path)
+        if size < self.offset:
+            self.truncated = True
+            return None
+        if size == self.offset:
+            return None
+
+        with open(self.path, "rb") as f:
+            f.seek(self.offset)
+            data = f.read(size - self.offset)
+        end, count = self._completeRecords(data)
+        self.offset += end
+        if not count:
+            return None
+
+        frame = pd.read_csv(io.BytesIO(self.header + data[:end]))
+        for column in frame.columns:
+            dtype = self.dtypes.get(column)
+            if dtype is None:
+                continue
+            if pd.api.types.is_datetime64_any_dtype(dtype):
+                if column == frame.columns[0] and self.timeFormat is not None:
+                    frame[column] = parse_datetimes(frame[column], self.timeFormat, errors="coerce")
+                else:
+                    frame[column] = pd.to_datetime(frame[column], errors="coerce")
+            elif pd.api.types.is_numeric_dtype(dtype):
+                frame[column] = pd.to_numeric(frame[column], errors="coerce")
+        return frame
+
+
+class OnlineEWM:
+    """ewm(span=span, adjust=False).mean() continued one value at a time
+
+    Follows pandas exactly, including how missing values decay the weight
+    of the running mean until the next observation.
+    """
+    def __init__(self, span):
+        self.alpha = 2.0 / (span + 1.0)
+        self.weighted = np.nan
+        self.oldWeight = 1.0
+
+    def start(self, values, output):
+        """Take over the state left by the batch transform over values"""
+        observed = np.flatnonzero(~np.isnan(values))
+        if observed.size:
+            self.weighted = output[observed[-1]]
+            self.oldWeight = (1.0 - self.alpha) ** (len(values) - 1 - observed[-1])
+
+    def update(self, values):
+        alpha = self.alpha
+        weighted = self.weighted
+        oldWeight = self.oldWeight
+        output = []
+        for value in values:
+            if weighted == weighted:
+                oldWeight *= 1.0 - alpha
+                if value == value:
+                    if weighted != value:
+                        weighted = (oldWeight * weighted + alpha * value) / (oldWeight + alpha)
+                    oldWeight = 1.0
+            elif value == value:
+                weighted = value
+            output.append(weighted)
+        self.weighted = weighted
+        self.oldWeight = oldWeight
+        return output
+
+
+class OnlineDoubleEWM:
+    """ewm applied twice (double exponential smoothing), continued one value at a time"""
+    def __init__(self, span):
+        self.span = span
+        self.first = OnlineEWM(span)
+        self.second = OnlineEWM(span)
+
+    def start(self, values, output):
+        smoothed = ewm_block(values, self.span)[:, 0]
+        self.first.start(values, smoothed)
+        self.second.start(smoothed, output)
+
+    def update(self, values):
+        return self.second.update(self.first.update(values))
+
+
+class OnlineRollingMean:
+    """Centered rolling(window).mean() continued one value at a time
+
+    The last (window - 1) // 2 outputs are missing until the values after
+    them arrive, so each update also fills in outputs it had left empty.
+    """
+    def __init__(self, window):
+        self.window = window
+        self.lag = (window - 1) // 2
+        self.recent = deque(maxlen=window)
+
+    def start(self, values, output):
+        self.recent.extend(values[-self.window:])
+
+    def update(self, values):
+        output = []
+        for value in values:
+            self.recent.append(value)
+            if len(self.recent) < self.window:
+                output.append(np.nan)
+            else:
+                # NaN whenever the window holds a missing value, as in pandas
+                output.append(sum(self.recent) / self.window)
+        return output
+
+
+# Batch transform -> online equivalent
+ONLINE_TRANSFORMS = {
+    ewm_mean: OnlineEWM,
+    double_ewm_mean: OnlineDoubleEWM,
+    rolling_mean: OnlineRollingMean,
+}
+
+
+class OnlineOverlay:
+    """An overlay series kept up to date as values are appended to its column"""
+    def __init__(self, overlay, values):
+        transform, params = OVERLAY_TRANSFORMS[overlay]
+        values = np.asarray(values, dtype=float)
+        output = apply_overlay_block(values, overlay)[:, 0]
+        self.state = ONLINE_TRANSFORMS[transform](**dict(params))
+        self.state.start(values, output)
+        self.lag = getattr(self.state, "lag", 0)
+        self.output = GrowingArray(output)
+
+    @staticmethod
+    def supports(overlay):
+        """True when the overlay has an online equivalent"""
+        return OVERLAY_TRANSFORMS[overlay][0] in ONLINE_TRANSFORMS
+
+    def extend(self, values):
+        """Append the overlay values for newly appended column values"""
+        if not len(values):
+            return
+        output = self.state.update(np.asarray(values, dtype=float).tolist())
+        if self.lag:
+            # Outputs lag behind by `lag` values: the first ones complete
+            # positions that were left missing by the previous update
+            self.output.extend(np.full(len(output), np.nan))
+            end = self.output.size - self.lag
+            start = max(end - len(output), 0)
+            if end > start:
+                self.output.view()[start:end] = output[len(output) - (end - start):]
+        else:
+            self.output.extend(output)
+
+    def values(self):
+        """The overlay over the whole column so far"""
+        return self.output.view()
@@ -0,0 +1,122 @@
+"""Dock listing single-pass column statistics of datasets and CSV files"""
+from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import (
+    QAbstractItemView, QComboBox, QDockWidget, QHeaderView, QLabel, QTableWidget, QTableWidgetItem,
+    QVBoxLayout, QWidget
+)
+
+from lazyimport import LazyModule
+
+chunkstats = LazyModule("chunkstats")
+
+
+def format_value(value):
+    """Counts with thousands separators, statistics to six significant digits"""
+    if isinstance(value, int):
+        return f"{value:,}"
+    return f"{value:.6g}"
+
+
+class SummaryPanel(QDockWidget):
+    """One row per numeric column: count, missing, mean, std, min, quantiles, max and ACF
+
+    Summaries are kept by name with the key they were computed for (the
+    dataset id and version for loaded datasets), so the window can tell
+    when one is out of date.
+    """
+    def __init__(self, parent=None):
+        super().__init__("Dataset Summary", parent)
+        self.setObjectName("summaryPanel")
+        self.summaries = {}
+
+        widget = QWidget()
+        layout = QVBoxLayout(widget)
+        self.sourceCombo = QComboBox()
+        self.sourceCombo.setToolTip("Loaded datasets and CSV files summarized so far")
+        self.sourceCombo.currentTextChanged.connect(self.showSummary)
+        self.infoLabel = QLabel("Select a dataset to summarize it.")
+        self.infoLabel.setWordWrap(True)
+        self.table = QTableWidget()
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        layout.addWidget(self.sourceCombo)
+        layout.addWidget(self.infoLabel)
+        layout.addWidget(self.table)
+        self.setWidget(widget)
+
+    def summaryKey(self, name):
+        """Key the finished summary of name was computed for, or None"""
+        key, summary = self.summaries.get(name, (None, None))
+        return key if summary is not None else None
+
+    def setPending(self, name, key=None):
+        """Show name as being computed"""
+        self.summaries[name] = (key, None)
+        self._select(name)
+
+    def setSummary(self, name, summary):
+        """Store and show a summarize_* result"""
+        key, _ = self.summaries.get(name, (None, None))
+        self.summaries[name] = (key, summary)
+        self._select(name)
+
+    def setFailed(self, name, message):
+        self.summaries.pop(name, None)
+        index = self.sourceCombo.findText(name)
+        if index >= 0:
+            self.sourceCombo.removeItem(index)
+        self.infoLabel.setText(f"Could not summarize {name}: {message}")
+
+    def clear(self):
+        self.summaries.clear()
+        self.sourceCombo.clear()
+        self.table.clear()
+        self.table.setRowCount(0)
+        self.table.setColumnCount(0)
+        self.infoLabel.setText("Select a dataset to summarize it.")
+
+    def _select(self, name):
+        if self.sourceCombo.findText(name) < 0:
+            self.sourceCombo.addItem(name)
+        if self.sourceCombo.currentText() != name:
+            self.sourceCombo.setCurrentText(name)
+        else:
+            self.showSummary(name)
+
+    def showSummary(self, name):
+        """Fill the table with the summary of name"""
+        if name not in self.summaries:
+            return
+        _, summary = self.summaries[name]
+        self.table.clear()
+        if summary is None:
+            self.table.setRowCount(0)
+            self.table.setColumnCount(0)
+            self.infoLabel.setText(f"Computing the summary of {name}...")
+            return
+
+        x = summary["x"]
+        info = f"{name}: {summary['rows']:,} rows"
+        if x["name"] is not None and x["first"] is not None:
+            info += f", {x['name']} from {x['first']} to {x['last']}"
+        if not summary["columns"]:
+            info += "\nNo numeric columns."
+        self.infoLabel.setText(info)
+
+        columns = list(summary["columns"].items())
+        first = columns[0][1] if columns else {"quantiles": {}, "acf": {}}
+        fields = [("count", "Count"), ("missing", "Missing"), ("mean", "Mean"), ("std", "Std"), ("min", "Min")]
+        fields += [(("quantiles", q), chunkstats.quantile_label(q)) for q in first["quantiles"]]
+        fields += [("max", "Max")]
+        fields += [(("acf", lag), f"ACF({lag})") for lag in first["acf"]]
+
+        self.table.setRowCount(len(columns))
+        self.table.setColumnCount(len(fields))
+        self.table.setHorizontalHeaderLabels([label for _, label in fields])
+        self.table.setVerticalHeaderLabels([str(column) for column, _ in columns])
+        for row, (_, stats) in enumerate(columns):
+            for col, (field, _) in enumerate(fields):
+                value = stats[field[0]][field[1]] if isinstance(field, tuple) else stats[field]
+                item = QTableWidgetItem("" if value != value else format_value(value))
+                item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                self.table.setItem(row, col, item)
@@ -0,0 +1,154 @@
+"""Smoothing and trend computations applied to dataset columns
+
+Every transform takes a (rows, columns) float64 block holding the columns
+side by side, plus the x values they share, and returns a block of the
+same shape, so any number of columns is transformed in a single call:
+
+    smoothed = apply_overlay_block(dataset.block(columns), "SES", x)
+
+The exponentially weighted means run as one compiled pass over the rows
+that updates every column (both stages of DES at once) when numba is
+installed, and as one vectorized pandas call on the whole block
+otherwise. The centered moving average adds shifted slices of the whole
+block. Holt and Holt-Winters keep their per-column recurrences.
+"""
+import numpy as np
+import pandas as pd
+
+from holtwinters import HAVE_NUMBA, double_exponential_smoothing, holt_winters, infer_period, njit
+
+
+@njit(cache=True)
+def _ewm(x, alpha, passes, out):
+    # pandas' ewm(adjust=False).mean() recurrence (see streaming.OnlineEWM),
+    # `passes` times chained: each stage takes the previous one's output
+    rows, columns = x.shape
+    weighted = np.full((passes, columns), np.nan)
+    oldWeight = np.ones((passes, columns))
+    for t in range(rows):
+        for c in range(columns):
+            value = x[t, c]
+            for p in range(passes):
+                w = weighted[p, c]
+                if w == w:
+                    old = oldWeight[p, c] * (1.0 - alpha)
+                    if value == value:
+                        if w != value:
+                            w = (old * w + alpha * value) / (old + alpha)
+                        old = 1.0
+                    oldWeight[p, c] = old
+                elif value == value:
+                    w = value
+                weighted[p, c] = w
+                value = w
+            out[t, c] = value
+    return out
+
+
+def as_block(values):
+    """values as a C-contiguous (rows, columns) float64 array; 1-D input is one column"""
+    block = np.ascontiguousarray(values, dtype=np.float64)
+    return block if block.ndim == 2 else block.reshape(-1, 1)
+
+
+def _columnwise(block, function):
+    """Block of function applied to each column, in column-major order so columns are contiguous"""
+    block = np.asfortranarray(block)
+    out = np.empty_like(block)
+    for column in range(block.shape[1]):
+        out[:, column] = function(block[:, column])
+    return out
+
+
+def ewm_block(block, span, passes=1):
+    """ewm(span=span, adjust=False).mean() of every column, chained `passes` times"""
+    block = as_block(block)
+    if HAVE_NUMBA:
+        return _ewm(block, 2.0 / (span + 1.0), passes, np.empty_like(block))
+    for _ in range(passes):
+        block = pd.DataFrame(block, copy=False).ewm(span=span, adjust=False).mean().to_numpy()
+    return block
+
+
+def ewm_mean(block, index, span):
+    """Exponentially weighted mean (simple exponential smoothing / EMA)"""
+    return ewm_block(block, span)
+
+
+def double_ewm_mean(block, index, span):
+    """Exponentially weighted mean applied twice (double exponential smoothing)"""
+    return ewm_block(block, span, passes=2)
+
+
+def rolling_mean(block, index, window):
+    """Centered simple moving average, missing wherever the window holds a missing value"""
+    block = as_block(block)
+    out = np.full(block.shape, np.nan)
+    count = len(block) - window + 1
+    if count > 0:
+        # Sum of the window starting at each row, centered like pandas' center=True
+        sums = block[:count].copy()
+        for offset in range(1, window):
+            sums += block[offset:offset + count]
+        out[window // 2:window // 2 + count] = sums / window
+    return out
+
+
+def holt_linear(block, index, alpha, beta):
+    """Holt's linear trend method"""
+    return _columnwise(as_block(block), lambda y: double_exponential_smoothing(y, alpha, beta))
+
+
+def seasonal_holt_winters(block, index, alpha, beta, gamma, multiplicative):
+    """Holt-Winters with the period inferred from the datetime x values
+
+    Falls back to additive seasonality for columns with non-positive data,
+    and to Holt's linear trend when no period can be inferred or the
+    series is too short.
+    """
+    block = as_block(block)
+    period = infer_period(pd.Index(index)) if index is not None else None
+    if period is None or len(block) < 2 * period:
+        return holt_linear(block, index, alpha, beta)
+
+    def fit(y):
+        return holt_winters(y, alpha, beta, gamma, period, multiplicative and np.nanmin(y) > 0)
+    return _columnwise(block, fit)
+
+
+# Overlay label -> (transform, parameters). The transform name and parameters
+# are part of the cache key, so overlays that compute the same series (SES
+# and EMA) share a single cached result.
+OVERLAY_TRANSFORMS = {
+    "SES": (ewm_mean, (("span", 5),)),
+    "DES": (double_ewm_mean, (("span", 5),)),
+    "SMA": (rolling_mean, (("window", 5),)),
+    "EMA": (ewm_mean, (("span", 5),)),
+    "Holt": (holt_linear, (("alpha", 1 / 3), ("beta", 0.1))),
+    "HW-A": (seasonal_holt_winters, (("alpha", 1 / 3), ("beta", 0.1), ("gamma", 0.1),
+                                     ("multiplicative", False))),
+    "HW-M": (seasonal_holt_winters, (("alpha", 1 / 3), ("beta", 0.1), ("gamma", 0.1),
+                                     ("multiplicative", True))),
+}
+
+
+def transform_key(overlay):
+    """Cache key part identifying the computation behind an overlay"""
+    transform, params = OVERLAY_TRANSFORMS[overlay]
+    return transform.__name__, params
+
+
+def apply_overlay_block(block, overlay, index=None):
+    """Compute an overlay for every column of a (rows, columns) block in one call
+
+    index holds the x values shared by the columns: seasonal models infer
+    their period from its datetime spacing.
+    """
+    transform, params = OVERLAY_TRANSFORMS[overlay]
+    return transform(as_block(block), index, **dict(params))
+
+
+def apply_overlay(series, overlay):
+    """Compute an overlay of a single column indexed by its x values, as a float array"""
+    series = pd.Series(series)
+    return apply_overlay_block(series.to_numpy(dtype=float, na_value=np.nan), overlay, series.index)[:, 0]
@@ -0,0 +1,238 @@
+"""Batched hyper-parameter search for the exponential smoothing models
+
+Every candidate (alpha, beta, gamma) of a grid is evaluated in one kernel
+call over the series: with numba the candidates are spread over all cores,
+each running the recurrence in registers; without it the model state is
+held as one array entry per candidate and all candidates are advanced
+together at each time step.
+Candidates are scored by their one-step-ahead mean squared error, the
+same fitted values the functions in holtwinters.py return.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from holtwinters import HAVE_NUMBA, _initial_level, _initial_state, njit
+
+if HAVE_NUMBA:
+    from numba import prange
+else:
+    prange = range
+
+# Model name -> (has trend, seasonality: 0 none, 1 additive, 2 multiplicative)
+MODELS = {
+    "SES": (False, 0),
+    "Holt": (True, 0),
+    "HW-A": (True, 1),
+    "HW-M": (True, 2),
+}
+
+# Candidates evaluated per kernel call; bounds the state memory of large grids
+CHUNK_SIZE = 4096
+
+
+# Candidates advanced together in the innermost loop of the compiled kernel;
+# independent recurrences side by side let the CPU overlap their latencies
+BLOCK_SIZE = 64
+
+
+@njit(cache=True, parallel=True)
+def _grid_mse_compiled(y, alpha, beta, gamma, season0, level0, trend0, useTrend, seasonal, start):
+    candidates = alpha.shape[0]
+    period = season0.shape[0]
+    mse = np.empty(candidates)
+    blocks = (candidates + BLOCK_SIZE - 1) // BLOCK_SIZE
+
+    for block in prange(blocks):
+        lo = block * BLOCK_SIZE
+        size = min(BLOCK_SIZE, candidates - lo)
+        a = alpha[lo:lo + size]
+        b = beta[lo:lo + size]
+        g = gamma[lo:lo + size]
+        level = np.full(size, level0)
+        trend = np.full(size, trend0)
+        season = np.empty((period, size))
+        for i in range(period):
+            season[i, :] = season0[i]
+        sse = np.zeros(size)
+        count = 0
+
+        j = start % period
+        for t in range(start, y.shape[0]):
+            value = y[t]
+            row = season[j]
+            if value != value:
+                for k in range(size):
+                    level[k] += trend[k]
+            else:
+                count += 1
+                for k in range(size):
+                    s = row[k]
+                    if seasonal == 2:
+                        error = value - (level[k] + trend[k]) * s
+                        newLevel = a[k] * (value / s) + (1.0 - a[k]) * (level[k] + trend[k])
+                        row[k] = g[k] * (value / newLevel) + (1.0 - g[k]) * s
+                    else:
+                        error = value - (level[k] + trend[k] + s)
+                        newLevel = a[k] * (value - s) + (1.0 - a[k]) * (level[k] + trend[k])
+                        if seasonal == 1:
+                            row[k] = g[k] * (value - newLevel) + (1.0 - g[k]) * s
+                    sse[k] += error * error
+                    if useTrend:
+                        trend[k] = b[k] * (newLevel - level[k]) + (1.0 - b[k]) * trend[k]
+                    level[k] = newLevel
+
+            # Season slot without a modulo per step
+            j += 1
+            if j == period:
+                j = 0
+
+        for k in range(size):
+            mse[lo + k] = sse[k] / max(count, 1)
+    return mse
+
+
+def _grid_mse_broadcast(y, alpha, beta, gamma, season0, level0, trend0, useTrend, seasonal, start):
+    """NumPy fallback: all candidates advance together as arrays at each step"""
+    period = len(season0)
+    level = np.full(len(alpha), level0)
+    trend = np.full(len(alpha), trend0)
+    season = np.repeat(season0[:, None], len(alpha), axis=1)
+    sse = np.zeros(len(alpha))
+    count = 0
+
+    for t in range(start, len(y)):
+        s = season[t % period]
+        forecast = (level + trend) * s if seasonal == 2 else level + trend + s
+        if np.isnan(y[t]):
+            level = level + trend
+            continue
+
+        sse += (y[t] - forecast) ** 2
+        count += 1
+
+        previous = level
+        if seasonal == 2:
+            level = alpha * (y[t] / s) + (1.0 - alpha) * (level + trend)
+            season[t % period] = gamma * (y[t] / level) + (1.0 - gamma) * s
+        else:
+            level = alpha * (y[t] - s) + (1.0 - alpha) * (level + trend)
+            if seasonal == 1:
+                season[t % period] = gamma * (y[t] - level) + (1.0 - gamma) * s
+        if useTrend:
+            trend = beta * (level - previous) + (1.0 - beta) * trend
+
+    return sse / max(count, 1)
+
+
+_grid_mse = _grid_mse_compiled if HAVE_NUMBA else _grid_mse_broadcast
+
+
+def evaluate_grid(y, model, alpha, beta=None, gamma=None, period=None):
+    """Return the one-step-ahead MSE of each (alpha[i], beta[i], gamma[i]) candidate"""
+    useTrend, seasonal = MODELS[model]
+    y = np.ascontiguousarray(y, dtype=np.float64)
+    alpha = np.atleast_1d(np.asarray(alpha, dtype=np.float64))
+    beta = np.zeros_like(alpha) if beta is None else np.broadcast_to(beta, alpha.shape).astype(np.float64)
+    gamma = np.zeros_like(alpha) if gamma is None else np.broadcast_to(gamma, alpha.shape).astype(np.float64)
+
+    if seasonal:
+        if not period or len(y) < 2 * period:
+            raise ValueError(f"{model} needs a period and at least two seasons of data")
+        if seasonal == 2 and np.nanmin(y) <= 0:
+            raise ValueError("Multiplicative seasonality needs strictly positive data")
+        season0, level0, trend0 = _initial_state(y, period, seasonal == 2)
+        start = 0
+    else:
+        # Same start as the holtwinters functions: the first observed value is its own fit
+        start, level0, trend0 = _initial_level(y, useTrend)
+        season0 = np.zeros(1)
+
+    mse = np.empty(len(alpha))
+    for lo in range(0, len(alpha), CHUNK_SIZE):
+        hi = lo + CHUNK_SIZE
+        mse[lo:hi] = _grid_mse(
+            y, np.ascontiguousarray(alpha[lo:hi]), np.ascontiguousarray(beta[lo:hi]),
+            np.ascontiguousarray(gamma[lo:hi]), np.ascontiguousarray(season0, dtype=np.float64),
+            float(level0), float(trend0),
+            useTrend, seasonal, start
+        )
+    return mse
+
+
+def _axes(model, alphas, betas, gammas):
+    """Parameter axes used by a model (beta/gamma pinned to 0 when unused)"""
+    useTrend, seasonal = MODELS[model]
+    return (
+        np.asarray(alphas, dtype=float),
+        np.asarray(betas if useTrend else [0.0], dtype=float),
+        np.asarray(gammas if seasonal else [0.0], dtype=float),
+    )
+
+
+def grid_search(y, model, alphas, betas=(), gammas=(), period=None):
+    """Evaluate the full product grid at once and return the best candidate
+
+    Returns a dict with alpha, beta, gamma and mse.
+    """
+    a, b, g = np.meshgrid(*_axes(model, alphas, betas, gammas), indexing="ij")
+    a, b, g = a.ravel(), b.ravel(), g.ravel()
+    mse = evaluate_grid(y, model, a, b, g, period)
+    best = int(np.nanargmin(mse))
+    return {
+        "alpha": float(a[best]), "beta": float(b[best]),
+        "gamma": float(g[best]), "mse": float(mse[best]),
+    }
+
+
+def refine_search(y, model, period=None, points=9, rounds=4, tolerance=1e-4):
+    """Coarse-to-fine search over (0, 1) for each parameter the model uses
+
+    Each round evaluates a `points`-per-axis grid, then narrows the grid
+    around the best candidate. Stops early once a round improves the MSE
+    by less than `tolerance` (relative).
+    """
+    useTrend, seasonal = MODELS[model]
+    center = np.array([0.5, 0.5, 0.5])
+    radius = 0.49
+    best = None
+
+    for _ in range(rounds):
+        axes = [
+            np.linspace(max(c - radius, 0.001), min(c + radius, 0.999), points)
+            for c in center
+        ]
+        result = grid_search(y, model, *axes, period=period)
+        improved = best is None or result["mse"] < best["mse"] * (1 - tolerance)
+        if best is None or result["mse"] < best["mse"]:
+            best = result
+        if not improved:
+            break
+        center = np.array([best["alpha"], best["beta"], best["gamma"]])
+        radius *= 2.0 / (points - 1)
+
+    return best
+
+
+def _search_job(job):
+    name, y, model, period, kwargs = job
+    try:
+        return name, model, refine_search(y, model, period, **kwargs)
+    except ValueError as e:
+        return name, model, {"error": str(e)}
+
+
+def search_many(jobs, max_workers=None, **kwargs):
+    """Run refine_search for many series in a process pool
+
+    jobs is an iterable of (name, values, model, period). Returns a dict
+    {(name, model): result}, where result holds either the best parameters
+    or an "error" message.
+    """
+    jobs = [(name, y, model, period, kwargs) for name, y, model, period in jobs]
+    results = {}
+    with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+        for name, model, result in executor.map(_search_job, jobs, chunksize=1):
+            results[(name, model)] = result
+    return results